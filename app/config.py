@@ -1,4 +1,7 @@
-from pydantic_settings import BaseSettings
+import os
+from zoneinfo import ZoneInfo
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
@@ -24,6 +27,10 @@ class Settings(BaseSettings):
     eccodes_definition_path: str = "/opt/anaconda3/share/eccodes/definitions"
     eccodes_samples_path: str = "/opt/anaconda3/share/eccodes/samples"
 
+    # Decoded GRIB grids persisted across restarts (empty disables)
+    grib_cache_dir: str = "~/.cache/mta-flood-api/grib"
+    grib_cache_max_mb: int = 4096
+
     # NOAA Tides & Currents API
     noaa_tides_base_url: str = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
     noaa_battery_station: str = "8518750"
@@ -69,9 +76,12 @@ class Settings(BaseSettings):
     default_atrisk_precip_rate: float = 0.4
     default_atrisk_accum_6hr: float = 1.5
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    # Deployments that already export their environment can set USE_DOTENV=0
+    # to skip reading .env
+    model_config = SettingsConfigDict(
+        env_file=".env" if os.getenv("USE_DOTENV", "1") == "1" else None,
+        env_file_encoding="utf-8",
+    )
 
     def validate_required(self) -> list[str]:
         missing = []
@@ -83,7 +93,7 @@ class Settings(BaseSettings):
 
 
 # Coastal stations that should have tide data applied
-COASTAL_STATIONS = [
+COASTAL_STATIONS = frozenset([
     "Broad Channel",
     "Howard Beach-JFK Airport",
     "Rockaway Park-Beach 116 St",
@@ -96,12 +106,28 @@ COASTAL_STATIONS = [
     "South Ferry",
     "Whitehall St-South Ferry",
     "Coney Island-Stillwell Av",
-]
+])
 
 # Valid boroughs
 VALID_BOROUGHS = ["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"]
 
+# Borough abbreviations used in the MTA stations dataset
+BOROUGH_MAP = {
+    "M": "Manhattan",
+    "Bk": "Brooklyn",
+    "Q": "Queens",
+    "Bx": "Bronx",
+    "SI": "Staten Island",
+}
+
+# Report dates and local timestamps are in New York time
+LOCAL_TZ = ZoneInfo("America/New_York")
+
 
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
+
+
+# Parsed once per process; import this instead of calling get_settings() on hot paths
+SETTINGS = get_settings()
@@ -1,13 +1,16 @@
 import asyncio
+import hashlib
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Query, Response
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import COASTAL_STATIONS, VALID_BOROUGHS, get_settings
+from app.config import BOROUGH_MAP, LOCAL_TZ, VALID_BOROUGHS, get_settings
 from app.models import (
     CurrentStatusResponse,
     FullReportResponse,
@@ -18,22 +21,45 @@ from app.models import (
     TidesResponse,
 )
 from app.services.mrms import mrms_service
-from app.services.stage4 import stage4_service
 from app.services.stations import stations_service
 from app.services.tides import tides_service
 from app.services.cdo import cdo_service
 from app.services.forecast import forecast_service
-from app.utils.excel import generate_csv_report, generate_excel_report
-from app.utils.risk import calculate_predicted_risk, calculate_risk, calculate_risk_with_reason
+from app.services.http import close_http_client
+from app.utils.cache import SingleFlight, TTLCache
+from app.utils.csv_export import iter_csv_rows
+from app.utils.risk import calculate_predicted_risk, calculate_risk_batch, calculate_risk_with_reason
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load station data before serving, keep the caches warm, and close the HTTP client on exit."""
+    await stations_service.load_stations()
+    missing = settings.validate_required()
+    if missing:
+        raise RuntimeError(f"Missing required config: {', '.join(missing)}")
+
+    mrms_service.start_background_refresh()
+    warm_task = asyncio.create_task(_keep_caches_warm())
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_task
+        await mrms_service.stop_background_refresh()
+        await close_http_client()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Flood risk monitoring API for NYC MTA subway stations using NOAA MRMS precipitation data and tide levels.",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -44,17 +70,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Short-lived response caches; MRMS updates every ~2 minutes and tides every 6
+_current_cache = TTLCache(ttl_seconds=60)
+_tides_cache = TTLCache(ttl_seconds=180)
+_health_cache = TTLCache(ttl_seconds=30)
+_report_flights = SingleFlight()
+
+
+def _weak_etag(*parts) -> str:
+    """Build a weak ETag from the values that determine a response body."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def _conditional(request: Request, response: Response, etag: str, max_age: int) -> Optional[Response]:
+    """
+    Attach validator and caching headers, short-circuiting with a 304 when the
+    client already holds the current representation.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={max_age * 2}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _timestamp_or_zero(value: Optional[datetime]) -> int:
+    return int(value.timestamp()) if value is not None else 0
+
+
+def _column_values(df: pd.DataFrame, column: str, default=None) -> list:
+    """Return a column as a plain list, or defaults when the column is absent."""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+
+def _forecast_keys(df: pd.DataFrame) -> list[str]:
+    """Build the rounded "lat,lon" forecast lookup key for every station."""
+    return (
+        df["latitude"].astype(float).round(3).astype(str)
+        + ","
+        + df["longitude"].astype(float).round(3).astype(str)
+    ).tolist()
+
 
 async def _fetch_forecasts_for_stations(stations_df):
     """Fetch forecast totals for unique lat/lon keys to reduce calls."""
     # Deduplicate by rounded lat/lon to reuse gridpoint responses
-    key_to_coords = {}
-    for _, row in stations_df.iterrows():
-        lat = float(row["latitude"])
-        lon = float(row["longitude"])
-        key = f"{round(lat, 3)},{round(lon, 3)}"
-        if key not in key_to_coords:
-            key_to_coords[key] = (lat, lon)
+    rounded = stations_df[["latitude", "longitude"]].astype(float).round(3).drop_duplicates()
+    key_to_coords = dict(
+        zip(
+            _forecast_keys(rounded),
+            zip(rounded["latitude"].tolist(), rounded["longitude"].tolist()),
+        )
+    )
 
     semaphore = asyncio.Semaphore(10)
     results = {}
@@ -71,13 +147,27 @@ async def _fetch_forecasts_for_stations(stations_df):
     return results
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Load station data on startup."""
-    await stations_service.load_stations()
-    missing = settings.validate_required()
-    if missing:
-        raise RuntimeError(f"Missing required config: {', '.join(missing)}")
+async def _warm_caches() -> None:
+    """Prefetch tide levels and today's CDO totals (MRMS refreshes itself)."""
+    today = datetime.now(timezone.utc).astimezone(LOCAL_TZ).strftime("%Y-%m-%d")
+    results = await asyncio.gather(
+        tides_service.get_current_tide_level(),
+        cdo_service.get_daily_precip_totals(today),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error warming caches: {result}")
+
+
+async def _keep_caches_warm(interval_seconds: float = 60) -> None:
+    """Warm the service caches now and then re-check them periodically."""
+    while True:
+        try:
+            await _warm_caches()
+        except Exception as e:
+            print(f"Error warming caches: {e}")
+        await asyncio.sleep(interval_seconds)
 
 
 @app.get("/")
@@ -91,7 +181,208 @@ async def root():
     }
 
 
-@app.get("/api/report", response_model=FullReportResponse)
+async def _build_station_reports(
+    report_date: str,
+    requested_local: datetime,
+    borough: Optional[str],
+    stations: Optional[str],
+    risk_only: bool,
+    use_historical: bool,
+    use_forecast: bool,
+) -> list[StationReport]:
+    """Fetch upstream data and build the per-station rows of a report."""
+    # Get stations
+    stations_df = await stations_service.get_stations(borough=borough)
+    if stations:
+        station_list = [s.strip().lower() for s in stations.split(",") if s.strip()]
+        if station_list:
+            stations_df = stations_df[
+                stations_df["station_name"].str.lower().isin(station_list)
+            ]
+
+    requested_utc = requested_local.astimezone(timezone.utc)
+
+    # Tide level and CDO daily totals don't depend on the precipitation
+    # lookup, so start them now and let their latency overlap with it
+    if use_historical:
+        tide_task = asyncio.create_task(tides_service.get_tide_level_at_time(requested_utc))
+    else:
+        tide_task = asyncio.create_task(tides_service.get_current_tide_level())
+    # Daily totals from NCEI CDO (Central Park, JFK, LaGuardia)
+    cdo_task = asyncio.create_task(cdo_service.get_daily_precip_totals(report_date))
+
+    # Get precipitation data
+    try:
+        if use_historical:
+            # Stage IV is only needed for historical reports; import on first use
+            from app.services.stage4 import stage4_service
+
+            stations_df, _ = await stage4_service.get_station_precipitation_at_time(
+                stations_df,
+                requested_utc,
+            )
+        else:
+            stations_df = await mrms_service.get_station_precipitation(stations_df)
+    except Exception as e:
+        tide_task.cancel()
+        cdo_task.cancel()
+        raise HTTPException(
+            status_code=503,
+            detail=f"NOAA precipitation data unavailable: {str(e)}",
+        )
+
+    tide_level, cdo_totals = await asyncio.gather(tide_task, cdo_task)
+
+    # Classify current risk first so forecasts are only fetched for the
+    # stations that end up in the report
+    is_coastal_arr = stations_df["is_coastal"].to_numpy(dtype=bool)
+    precip_rates = np.asarray(_column_values(stations_df, "precip_rate_in_hr", 0), dtype=float)
+    accum_1hr = np.asarray(_column_values(stations_df, "accum_1hr_in", 0), dtype=float)
+    accum_6hr = np.asarray(_column_values(stations_df, "accum_6hr_in", 0), dtype=float)
+
+    risks, risk_reasons = calculate_risk_batch(
+        structures=stations_df["structure"],
+        precip_rate_in_hr=precip_rates,
+        accum_6hr_in=accum_6hr,
+        tide_level_ft=tide_level,
+        is_coastal=is_coastal_arr,
+    )
+
+    # Filter if risk_only is requested
+    if risk_only:
+        keep = np.array([risk != RiskLevel.LOW for risk in risks], dtype=bool)
+        stations_df = stations_df[keep]
+        is_coastal_arr = is_coastal_arr[keep]
+        precip_rates = precip_rates[keep]
+        accum_1hr = accum_1hr[keep]
+        accum_6hr = accum_6hr[keep]
+        risks = [risk for risk, kept in zip(risks, keep) if kept]
+        risk_reasons = [reason for reason, kept in zip(risk_reasons, keep) if kept]
+
+    # Fetch forecasts for the remaining unique gridpoints when report is for today.
+    # Stations already at HIGH risk can't be raised further, so skip them
+    forecast_map = {}
+    if use_forecast:
+        needs_forecast = np.array([risk != RiskLevel.HIGH for risk in risks], dtype=bool)
+        if needs_forecast.any():
+            forecast_map = await _fetch_forecasts_for_stations(stations_df[needs_forecast])
+
+    # Build station reports
+    rows = zip(
+        _column_values(stations_df, "line"),
+        stations_df["station_name"].tolist(),
+        stations_df["borough"].tolist(),
+        _column_values(stations_df, "cbd"),
+        _column_values(stations_df, "daytime_routes"),
+        stations_df["structure"].tolist(),
+        stations_df["latitude"].tolist(),
+        stations_df["longitude"].tolist(),
+        precip_rates.tolist(),
+        accum_1hr.tolist(),
+        accum_6hr.tolist(),
+        is_coastal_arr.tolist(),
+        risks,
+        risk_reasons,
+        _forecast_keys(stations_df),
+    )
+
+    station_reports = []
+    for (
+        line,
+        station_name,
+        station_borough,
+        cbd_value,
+        daytime_routes,
+        structure,
+        latitude,
+        longitude,
+        precip_rate,
+        accum_1hr_in,
+        accum_6hr_in,
+        is_coastal,
+        risk,
+        risk_reason,
+        forecast_key,
+    ) in rows:
+        station_tide = tide_level if is_coastal else None
+        if isinstance(cbd_value, bool):
+            cbd_value = "Y" if cbd_value else "N"
+        elif cbd_value is not None:
+            cbd_value = str(cbd_value)
+
+        forecast_6hr_in = None
+        forecast_24hr_in = None
+        predicted_risk_6hr = None
+        predicted_risk_24hr = None
+
+        if use_forecast and risk != RiskLevel.HIGH:
+            forecast_6hr_in, forecast_24hr_in, _ = forecast_map.get(
+                forecast_key, (None, None, None)
+            )
+
+            if forecast_6hr_in is not None:
+                predicted_risk_6hr = calculate_predicted_risk(
+                    structure=structure,
+                    forecast_total_in=forecast_6hr_in,
+                    window_hours=6,
+                    tide_level_ft=station_tide,
+                    is_coastal=is_coastal,
+                )
+
+            if forecast_24hr_in is not None:
+                predicted_risk_24hr = calculate_predicted_risk(
+                    structure=structure,
+                    forecast_total_in=forecast_24hr_in,
+                    window_hours=24,
+                    tide_level_ft=station_tide,
+                    is_coastal=is_coastal,
+                )
+
+        # Every value here is already a plain Python object of the declared
+        # type, so skip per-row validation
+        report = StationReport.model_construct(
+            line=line,
+            station_name=station_name,
+            borough=BOROUGH_MAP.get(station_borough, station_borough),
+            cbd=cbd_value,
+            daytime_routes=daytime_routes,
+            structure=structure,
+            latitude=latitude,
+            longitude=longitude,
+            precip_rate_in_hr=round(precip_rate, 4),
+            accum_1hr_in=round(accum_1hr_in, 4),
+            accum_6hr_in=round(accum_6hr_in, 4),
+            tide_level_ft=round(station_tide, 2) if station_tide else None,
+            central_park_daily_in=cdo_totals.get("central_park_daily_in"),
+            central_park_daily_date=cdo_totals.get("central_park_daily_date"),
+            jfk_daily_in=cdo_totals.get("jfk_daily_in"),
+            jfk_daily_date=cdo_totals.get("jfk_daily_date"),
+            lga_daily_in=cdo_totals.get("lga_daily_in"),
+            lga_daily_date=cdo_totals.get("lga_daily_date"),
+            forecast_6hr_in=round(forecast_6hr_in, 4)
+            if forecast_6hr_in is not None
+            else None,
+            forecast_24hr_in=round(forecast_24hr_in, 4)
+            if forecast_24hr_in is not None
+            else None,
+            predicted_risk_6hr=predicted_risk_6hr,
+            predicted_risk_24hr=predicted_risk_24hr,
+            risk_level=risk,
+            risk_reason=risk_reason,
+            source="NOAA MRMS; NOAA CDO; NWS",
+        )
+        station_reports.append(report)
+
+    return station_reports
+
+
+# Rows are built with model_construct, so the report is serialized directly
+# rather than re-validated through response_model; the schema stays in the docs
+@app.get(
+    "/api/report",
+    response_model=None,
+    responses={200: {"model": FullReportResponse}},
+)
 async def get_report(
     date: Optional[str] = Query(None, description="Report date (YYYY-MM-DD), defaults to today"),
     time: Optional[str] = Query(None, description="Report time (HH:MM), optional"),
@@ -121,9 +412,7 @@ async def get_report(
         )
 
     # Get report date
-    local_tz = ZoneInfo("America/New_York")
-    generated_at = datetime.now(timezone.utc)
-    generated_local = generated_at.astimezone(local_tz)
+    generated_local = datetime.now(timezone.utc).astimezone(LOCAL_TZ)
     report_date = date or generated_local.strftime("%Y-%m-%d")
     try:
         report_date_obj = datetime.strptime(report_date, "%Y-%m-%d").date()
@@ -138,7 +427,7 @@ async def get_report(
             requested_local = datetime.strptime(report_date, "%Y-%m-%d").replace(
                 hour=parsed_time.hour,
                 minute=parsed_time.minute,
-                tzinfo=local_tz,
+                tzinfo=LOCAL_TZ,
             )
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM (24-hour).")
@@ -146,139 +435,23 @@ async def get_report(
         requested_local = generated_local
 
     is_today = report_date == generated_local.strftime("%Y-%m-%d")
-    now_local = generated_local
-    use_historical = requested_local < now_local - timedelta(minutes=5)
+    use_historical = requested_local < generated_local - timedelta(minutes=5)
     use_forecast = is_today
 
     try:
-        # Get stations
-        stations_df = await stations_service.get_stations(borough=borough)
-        if stations:
-            station_list = [s.strip().lower() for s in stations.split(",") if s.strip()]
-            if station_list:
-                stations_df = stations_df[
-                    stations_df["station_name"].str.lower().isin(station_list)
-                ]
-
-        # Get precipitation data
-        try:
-            if use_historical:
-                stations_df, _ = await stage4_service.get_station_precipitation_at_time(
-                    stations_df,
-                    requested_local.astimezone(timezone.utc),
-                )
-            else:
-                stations_df = await mrms_service.get_station_precipitation(stations_df)
-        except Exception as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"NOAA precipitation data unavailable: {str(e)}",
-            )
-
-        # Get tide level for coastal stations
-        if use_historical:
-            tide_level = await tides_service.get_tide_level_at_time(
-                requested_local.astimezone(timezone.utc)
-            )
-        else:
-            tide_level = await tides_service.get_current_tide_level()
-
-        # Fetch daily totals from NCEI CDO (Central Park, JFK, LaGuardia)
-        cdo_totals = await cdo_service.get_daily_precip_totals(report_date)
-
-        # Pre-fetch forecasts for unique gridpoints when report is for today
-        forecast_map = {}
-        if use_forecast:
-            forecast_map = await _fetch_forecasts_for_stations(stations_df)
-
-        # Build station reports
-        station_reports = []
-        for _, row in stations_df.iterrows():
-            is_coastal = row.get("is_coastal", False) or row["station_name"] in COASTAL_STATIONS
-            station_tide = tide_level if is_coastal else None
-            cbd_value = row.get("cbd")
-            if isinstance(cbd_value, bool):
-                cbd_value = "Y" if cbd_value else "N"
-            elif cbd_value is not None:
-                cbd_value = str(cbd_value)
-
-            risk, risk_reason = calculate_risk_with_reason(
-                structure=row["structure"],
-                precip_rate_in_hr=row.get("precip_rate_in_hr", 0),
-                accum_6hr_in=row.get("accum_6hr_in", 0),
-                tide_level_ft=station_tide,
-                is_coastal=is_coastal,
-            )
-
-            forecast_6hr_in = None
-            forecast_24hr_in = None
-            predicted_risk_6hr = None
-            predicted_risk_24hr = None
-
-            if use_forecast:
-                key = f"{round(float(row['latitude']), 3)},{round(float(row['longitude']), 3)}"
-                forecast_6hr_in, forecast_24hr_in, _ = forecast_map.get(
-                    key, (None, None, None)
-                )
-
-                if forecast_6hr_in is not None:
-                    predicted_risk_6hr = calculate_predicted_risk(
-                        structure=row["structure"],
-                        forecast_total_in=forecast_6hr_in,
-                        window_hours=6,
-                        tide_level_ft=station_tide,
-                        is_coastal=is_coastal,
-                    )
-
-                if forecast_24hr_in is not None:
-                    predicted_risk_24hr = calculate_predicted_risk(
-                        structure=row["structure"],
-                        forecast_total_in=forecast_24hr_in,
-                        window_hours=24,
-                        tide_level_ft=station_tide,
-                        is_coastal=is_coastal,
-                    )
-
-            # Filter if risk_only is requested
-            if risk_only and risk == RiskLevel.LOW:
-                continue
-
-            # Map borough abbreviation to full name
-            borough_map = {"M": "Manhattan", "Bk": "Brooklyn", "Q": "Queens", "Bx": "Bronx", "SI": "Staten Island"}
-            full_borough = borough_map.get(row["borough"], row["borough"])
-
-            report = StationReport(
-                line=row.get("line"),
-                station_name=row["station_name"],
-                borough=full_borough,
-                cbd=cbd_value,
-                daytime_routes=row.get("daytime_routes"),
-                structure=row["structure"],
-                latitude=row["latitude"],
-                longitude=row["longitude"],
-                precip_rate_in_hr=round(row.get("precip_rate_in_hr", 0), 4),
-                accum_1hr_in=round(row.get("accum_1hr_in", 0), 4),
-                accum_6hr_in=round(row.get("accum_6hr_in", 0), 4),
-                tide_level_ft=round(station_tide, 2) if station_tide else None,
-                central_park_daily_in=cdo_totals.get("central_park_daily_in"),
-                central_park_daily_date=cdo_totals.get("central_park_daily_date"),
-                jfk_daily_in=cdo_totals.get("jfk_daily_in"),
-                jfk_daily_date=cdo_totals.get("jfk_daily_date"),
-                lga_daily_in=cdo_totals.get("lga_daily_in"),
-                lga_daily_date=cdo_totals.get("lga_daily_date"),
-                forecast_6hr_in=round(forecast_6hr_in, 4)
-                if forecast_6hr_in is not None
-                else None,
-                forecast_24hr_in=round(forecast_24hr_in, 4)
-                if forecast_24hr_in is not None
-                else None,
-                predicted_risk_6hr=predicted_risk_6hr,
-                predicted_risk_24hr=predicted_risk_24hr,
-                risk_level=risk,
-                risk_reason=risk_reason,
-                source="NOAA MRMS; NOAA CDO; NWS",
-            )
-            station_reports.append(report)
+        # Identical concurrent requests share one upstream fan-out
+        station_reports = await _report_flights.run(
+            (report_date, time, borough, stations, risk_only),
+            lambda: _build_station_reports(
+                report_date=report_date,
+                requested_local=requested_local,
+                borough=borough,
+                stations=stations,
+                risk_only=risk_only,
+                use_historical=use_historical,
+                use_forecast=use_forecast,
+            ),
+        )
 
         # Count risk levels
         high_count = sum(1 for s in station_reports if s.risk_level == RiskLevel.HIGH)
@@ -286,6 +459,9 @@ async def get_report(
 
         # Handle different output formats
         if format == ReportFormat.XLSX:
+            # openpyxl is slow to import, so load the Excel exporter on first use
+            from app.utils.excel import generate_excel_report
+
             excel_file = generate_excel_report(station_reports, report_date, requested_local)
             filename = f"mta_precp_{report_date}.xlsx"
             return StreamingResponse(
@@ -295,16 +471,15 @@ async def get_report(
             )
 
         if format == ReportFormat.CSV:
-            csv_content = generate_csv_report(station_reports, report_date, requested_local)
             filename = f"mta_precp_{report_date}.csv"
-            return Response(
-                content=csv_content,
+            return StreamingResponse(
+                iter_csv_rows(station_reports, report_date, requested_local),
                 media_type="text/csv",
                 headers={"Content-Disposition": f"attachment; filename={filename}"},
             )
 
         # Default: JSON response
-        return FullReportResponse(
+        report = FullReportResponse.model_construct(
             generated_at=requested_local,
             report_date=report_date,
             source="NOAA MRMS; NOAA CDO; NWS",
@@ -313,6 +488,7 @@ async def get_report(
             at_risk_count=at_risk_count,
             stations=station_reports,
         )
+        return Response(content=report.model_dump_json(), media_type="application/json")
 
     except HTTPException:
         raise
@@ -321,12 +497,17 @@ async def get_report(
 
 
 @app.get("/api/current", response_model=CurrentStatusResponse)
-async def get_current_status():
+async def get_current_status(request: Request, response: Response):
     """
     Get a quick snapshot of current high-risk stations.
 
     Returns lists of station names currently at HIGH or AT RISK levels.
     """
+    etag, status = await _current_cache.get_or_set("current", _build_current_status)
+    return _conditional(request, response, etag, max_age=60) or status
+
+
+async def _build_current_status() -> tuple[str, CurrentStatusResponse]:
     try:
         stations_df = await stations_service.get_stations()
 
@@ -340,28 +521,26 @@ async def get_current_status():
 
         tide_level = await tides_service.get_current_tide_level()
 
-        high_risk = []
-        at_risk = []
-
-        for _, row in stations_df.iterrows():
-            is_coastal = row.get("is_coastal", False) or row["station_name"] in COASTAL_STATIONS
-            station_tide = tide_level if is_coastal else None
-
-            risk = calculate_risk(
-                structure=row["structure"],
-                precip_rate_in_hr=row.get("precip_rate_in_hr", 0),
-                accum_6hr_in=row.get("accum_6hr_in", 0),
-                tide_level_ft=station_tide,
-                is_coastal=is_coastal,
-            )
+        is_coastal_arr = stations_df["is_coastal"].to_numpy(dtype=bool)
+        risks, _ = calculate_risk_batch(
+            structures=stations_df["structure"],
+            precip_rate_in_hr=np.asarray(_column_values(stations_df, "precip_rate_in_hr", 0), dtype=float),
+            accum_6hr_in=np.asarray(_column_values(stations_df, "accum_6hr_in", 0), dtype=float),
+            tide_level_ft=tide_level,
+            is_coastal=is_coastal_arr,
+            with_reason=False,
+        )
 
-            if risk == RiskLevel.HIGH:
-                high_risk.append(row["station_name"])
-            elif risk == RiskLevel.AT_RISK:
-                at_risk.append(row["station_name"])
+        station_names = stations_df["station_name"].tolist()
+        high_risk = [name for name, risk in zip(station_names, risks) if risk == RiskLevel.HIGH]
+        at_risk = [name for name, risk in zip(station_names, risks) if risk == RiskLevel.AT_RISK]
 
-        return CurrentStatusResponse(
-            timestamp=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
+        etag = _weak_etag(
+            _timestamp_or_zero(tides_service.last_updated),
+            _timestamp_or_zero(mrms_service.last_updated),
+        )
+        return etag, CurrentStatusResponse(
+            timestamp=datetime.now(timezone.utc).astimezone(LOCAL_TZ),
             high_risk_stations=high_risk,
             at_risk_stations=at_risk,
             high_risk_count=len(high_risk),
@@ -382,6 +561,7 @@ async def get_station_detail(station_name: str):
     Includes current precipitation data, tide level (if coastal),
     and calculated risk level.
     """
+    now_local = datetime.now(timezone.utc).astimezone(LOCAL_TZ)
     station = await stations_service.get_station_by_name(station_name)
 
     if not station:
@@ -401,7 +581,7 @@ async def get_station_detail(station_name: str):
             detail=f"NOAA MRMS data unavailable: {str(e)}",
         )
 
-    is_coastal = station.get("is_coastal", False) or station["station_name"] in COASTAL_STATIONS
+    is_coastal = bool(station["is_coastal"])
     tide_level = None
 
     if is_coastal:
@@ -415,7 +595,7 @@ async def get_station_detail(station_name: str):
         is_coastal=is_coastal,
     )
 
-    report_date = datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")).strftime("%Y-%m-%d")
+    report_date = now_local.strftime("%Y-%m-%d")
     cdo_totals = await cdo_service.get_daily_precip_totals(report_date)
 
     forecast_6hr_in, forecast_24hr_in = await forecast_service.get_forecast_totals(
@@ -441,12 +621,10 @@ async def get_station_detail(station_name: str):
             is_coastal=is_coastal,
         )
 
-    borough_map = {"M": "Manhattan", "Bk": "Brooklyn", "Q": "Queens", "Bx": "Bronx", "SI": "Staten Island"}
-
     return StationDetailResponse(
         station_id=str(station["station_id"]),
         station_name=station["station_name"],
-        borough=borough_map.get(station["borough"], station["borough"]),
+        borough=BOROUGH_MAP.get(station["borough"], station["borough"]),
         structure=station["structure"],
         latitude=station["latitude"],
         longitude=station["longitude"],
@@ -469,17 +647,22 @@ async def get_station_detail(station_name: str):
         risk_reason=risk_reason,
         is_coastal=is_coastal,
         source="NOAA MRMS; NOAA CDO; NWS",
-        last_updated=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
+        last_updated=now_local,
     )
 
 
 @app.get("/api/tides", response_model=TidesResponse)
-async def get_tides():
+async def get_tides(request: Request, response: Response):
     """
     Get current tide levels from NOAA stations.
 
     Returns water level readings from The Battery and Kings Point stations.
     """
+    etag, tides = await _tides_cache.get_or_set("tides", _build_tides)
+    return _conditional(request, response, etag, max_age=180) or tides
+
+
+async def _build_tides() -> tuple[str, TidesResponse]:
     try:
         readings = await tides_service.get_all_tide_readings()
 
@@ -489,8 +672,9 @@ async def get_tides():
                 detail="Tide data unavailable from NOAA",
             )
 
-        return TidesResponse(
-            timestamp=datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")),
+        etag = _weak_etag(*(f"{r.station_id}:{int(r.timestamp.timestamp())}" for r in readings))
+        return etag, TidesResponse(
+            timestamp=datetime.now(timezone.utc).astimezone(LOCAL_TZ),
             readings=readings,
         )
 
@@ -501,24 +685,31 @@ async def get_tides():
 
 
 @app.get("/api/health")
-async def health_check():
+async def health_check(request: Request, response: Response):
     """
     Check availability of all data sources.
     """
+    etag, health = await _health_cache.get_or_set("health", _build_health)
+    return _conditional(request, response, etag, max_age=30) or health
+
+
+async def _build_health() -> tuple[str, dict]:
     mrms_available = await mrms_service.is_available()
     tides_available = await tides_service.is_available()
     cdo_available = await cdo_service.is_available()
     station_count = await stations_service.get_station_count()
 
-    return {
+    data_sources = {
+        "mrms": "available" if mrms_available else "unavailable",
+        "tides": "available" if tides_available else "unavailable",
+        "cdo": "available" if cdo_available else "unavailable",
+        "stations": f"{station_count} loaded" if station_count > 0 else "not loaded",
+    }
+
+    return _weak_etag(*sorted(data_sources.items())), {
         "status": "healthy" if mrms_available and tides_available and cdo_available else "degraded",
-        "data_sources": {
-            "mrms": "available" if mrms_available else "unavailable",
-            "tides": "available" if tides_available else "unavailable",
-            "cdo": "available" if cdo_available else "unavailable",
-            "stations": f"{station_count} loaded" if station_count > 0 else "not loaded",
-        },
-        "timestamp": datetime.now(timezone.utc).astimezone(ZoneInfo("America/New_York")).isoformat(),
+        "data_sources": data_sources,
+        "timestamp": datetime.now(timezone.utc).astimezone(LOCAL_TZ).isoformat(),
     }
 
 
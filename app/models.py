@@ -11,6 +11,15 @@ class RiskLevel(str, Enum):
     LOW = "CLEAR"
 
 
+# Forecasts are skipped for stations already at FLOOD WARNING, since their
+# risk can't be raised further; exports mark those cells instead of leaving them blank
+FORECAST_SKIPPED_MARKER = "N/A (already FLOOD WARNING)"
+FORECAST_FIELD_NOTE = (
+    "Only set for today's report; always null when risk_level is FLOOD WARNING "
+    "because forecasts are skipped for those stations"
+)
+
+
 class ReportFormat(str, Enum):
     JSON = "json"
     CSV = "csv"
@@ -55,10 +64,10 @@ class StationReport(BaseModel):
     jfk_daily_date: Optional[str] = None
     lga_daily_in: Optional[float] = None
     lga_daily_date: Optional[str] = None
-    forecast_6hr_in: Optional[float] = None
-    forecast_24hr_in: Optional[float] = None
-    predicted_risk_6hr: Optional[RiskLevel] = None
-    predicted_risk_24hr: Optional[RiskLevel] = None
+    forecast_6hr_in: Optional[float] = Field(None, description=FORECAST_FIELD_NOTE)
+    forecast_24hr_in: Optional[float] = Field(None, description=FORECAST_FIELD_NOTE)
+    predicted_risk_6hr: Optional[RiskLevel] = Field(None, description=FORECAST_FIELD_NOTE)
+    predicted_risk_24hr: Optional[RiskLevel] = Field(None, description=FORECAST_FIELD_NOTE)
     risk_level: RiskLevel
     risk_reason: Optional[str] = None
     source: str = "NOAA MRMS"
@@ -1,9 +1,9 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import httpx
-
-from app.config import get_settings
+from app.config import LOCAL_TZ, get_settings
+from app.services.http import get_http_client
+from app.utils.cache import SingleFlight
 
 
 class CDOService:
@@ -11,6 +11,17 @@ class CDOService:
 
     def __init__(self):
         self.settings = get_settings()
+        # report_date -> (expires_at or None for never, totals)
+        self._totals_cache: dict[str, tuple[Optional[datetime], dict]] = {}
+        self._cache_ttl = timedelta(hours=6)
+        # Empty results are retried after this long rather than on every call,
+        # doubling for each consecutive empty result up to the max, so an
+        # outage or rate limit is not hammered by the cache warmer
+        self._negative_cache_ttl = timedelta(minutes=5)
+        self._max_negative_cache_ttl = timedelta(hours=1)
+        self._empty_streak = 0
+        self._cache_max_entries = 512
+        self._flights = SingleFlight()
 
     def _build_headers(self) -> dict:
         token = self.settings.ncei_cdo_token
@@ -35,15 +46,15 @@ class CDOService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.ncei_cdo_base_url,
-                    params=params,
-                    headers=self._build_headers(),
-                    timeout=15.0,
-                )
-                response.raise_for_status()
-                data = response.json()
+            client = get_http_client()
+            response = await client.get(
+                self.settings.ncei_cdo_base_url,
+                params=params,
+                headers=self._build_headers(),
+                timeout=15.0,
+            )
+            response.raise_for_status()
+            data = response.json()
 
             results = data.get("results", [])
             if not results:
@@ -85,14 +96,58 @@ class CDOService:
 
         return None, None
 
+    def _is_cache_valid(self, report_date: str) -> bool:
+        """Check if cached totals for a date are still valid."""
+        cached = self._totals_cache.get(report_date)
+        if cached is None:
+            return False
+        expires_at = cached[0]
+        return expires_at is None or datetime.now(timezone.utc) < expires_at
+
+    def _store_totals(self, report_date: str, totals: dict) -> None:
+        """Cache totals for a date; complete values for past dates never change."""
+        values = [totals[k] for k in ("central_park_daily_in", "jfk_daily_in", "lga_daily_in")]
+        dates = [totals[k] for k in ("central_park_daily_date", "jfk_daily_date", "lga_daily_date")]
+        now = datetime.now(timezone.utc)
+        if all(v is None for v in values):
+            # Likely an upstream failure; retry later
+            backoff = self._negative_cache_ttl * (2 ** min(self._empty_streak, 8))
+            expires_at = now + min(backoff, self._max_negative_cache_ttl)
+            self._empty_streak += 1
+        else:
+            self._empty_streak = 0
+            # Values for today are preliminary and can still be revised
+            today = now.astimezone(LOCAL_TZ).strftime("%Y-%m-%d")
+            complete = (
+                report_date < today
+                and all(v is not None for v in values)
+                and all(d is not None and d[:10] == report_date for d in dates)
+            )
+            expires_at = None if complete else now + self._cache_ttl
+
+        self._totals_cache.pop(report_date, None)
+        self._totals_cache[report_date] = (expires_at, totals)
+        while len(self._totals_cache) > self._cache_max_entries:
+            self._totals_cache.pop(next(iter(self._totals_cache)))
+
     async def get_daily_precip_totals(self, report_date: str) -> dict[str, Optional[float]]:
+        """Get daily precipitation totals for Central Park, JFK, and LaGuardia."""
+        if self._is_cache_valid(report_date):
+            return self._totals_cache[report_date][1]
+
+        # Concurrent requests for the same date share one set of CDO calls
+        return await self._flights.run(
+            report_date, lambda: self._fetch_daily_precip_totals(report_date)
+        )
+
+    async def _fetch_daily_precip_totals(self, report_date: str) -> dict[str, Optional[float]]:
         """Fetch daily precipitation totals for Central Park, JFK, and LaGuardia."""
         settings = self.settings
         cp, cp_date = await self._fetch_with_fallback(settings.ghcnd_central_park_station, report_date)
         jfk, jfk_date = await self._fetch_with_fallback(settings.ghcnd_jfk_station, report_date)
         lga, lga_date = await self._fetch_with_fallback(settings.ghcnd_lga_station, report_date)
 
-        return {
+        totals = {
             "central_park_daily_in": cp,
             "central_park_daily_date": cp_date,
             "jfk_daily_in": jfk,
@@ -100,6 +155,8 @@ class CDOService:
             "lga_daily_in": lga,
             "lga_daily_date": lga_date,
         }
+        self._store_totals(report_date, totals)
+        return totals
 
     async def is_available(self) -> bool:
         """Check if CDO is available."""
@@ -113,14 +170,14 @@ class CDOService:
                 "units": "standard",
                 "limit": 1,
             }
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.ncei_cdo_base_url,
-                    params=params,
-                    headers=self._build_headers(),
-                    timeout=10.0,
-                )
-                return response.status_code == 200
+            client = get_http_client()
+            response = await client.get(
+                self.settings.ncei_cdo_base_url,
+                params=params,
+                headers=self._build_headers(),
+                timeout=10.0,
+            )
+            return response.status_code == 200
         except Exception:
             return False
 
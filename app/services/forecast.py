@@ -2,9 +2,8 @@ import re
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import httpx
-
 from app.config import get_settings
+from app.services.http import get_http_client
 
 
 class ForecastService:
@@ -57,13 +56,13 @@ class ForecastService:
         headers = {"User-Agent": "mta-flood-api"}
 
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(url, headers=headers, timeout=15.0)
-                response.raise_for_status()
-                data = response.json()
-                self._points_cache[key] = data
-                self._cache_time[key] = datetime.now(timezone.utc)
-                return data
+            client = get_http_client()
+            response = await client.get(url, headers=headers, timeout=15.0)
+            response.raise_for_status()
+            data = response.json()
+            self._points_cache[key] = data
+            self._cache_time[key] = datetime.now(timezone.utc)
+            return data
         except Exception as e:
             print(f"Error fetching NWS points for {lat},{lon}: {e}")
             return None
@@ -74,13 +73,13 @@ class ForecastService:
 
         headers = {"User-Agent": "mta-flood-api"}
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(grid_url, headers=headers, timeout=15.0)
-                response.raise_for_status()
-                data = response.json()
-                self._grid_cache[grid_url] = data
-                self._cache_time[grid_url] = datetime.now(timezone.utc)
-                return data
+            client = get_http_client()
+            response = await client.get(grid_url, headers=headers, timeout=15.0)
+            response.raise_for_status()
+            data = response.json()
+            self._grid_cache[grid_url] = data
+            self._cache_time[grid_url] = datetime.now(timezone.utc)
+            return data
         except Exception as e:
             print(f"Error fetching NWS grid data: {e}")
             return None
@@ -0,0 +1,35 @@
+import importlib.util
+from typing import Optional
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (installed via httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide pooled HTTP client, creating it on first use.
+
+    Sharing one client lets calls to the same NOAA/NWS host reuse warm
+    connections instead of opening a new TLS session per request.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=10.0,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client if it was opened."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
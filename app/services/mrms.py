@@ -1,26 +1,18 @@
-import gzip
-import os
-import tempfile
+import asyncio
+from contextlib import suppress
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Optional
 
 import boto3
-import httpx
 import numpy as np
 import pandas as pd
 from botocore import UNSIGNED
 from botocore.config import Config
 
 from app.config import get_settings
-
-settings = get_settings()
-if not os.environ.get("ECCODES_DEFINITION_PATH"):
-    os.environ["ECCODES_DEFINITION_PATH"] = settings.eccodes_definition_path
-if not os.environ.get("ECCODES_SAMPLES_PATH"):
-    os.environ["ECCODES_SAMPLES_PATH"] = settings.eccodes_samples_path
-
-import pygrib
+from app.services.http import get_http_client
+from app.utils.cache import DiskArrayCache, LRUCache, SingleFlight
+from app.utils.grib import read_first_message, read_first_message_from_gzip_stream
 
 
 class MRMSService:
@@ -53,16 +45,32 @@ class MRMSService:
         "qpe_06h": 60,
     }
 
+    # The background refresher replaces the latest grids this long before they expire
+    REFRESH_LEAD_SECONDS = 15
+
+    # S3 key discovery lists this many product intervals back from now
+    S3_LOOKBACK_INTERVALS = 3
+
+    # Candidate files probed concurrently when searching for the nearest one
+    PROBE_BATCH_SIZE = 16
+    # Existence checks fetch one byte instead of the file
+    PROBE_RANGE_HEADERS = {"Range": "bytes=0-0"}
+
     def __init__(self):
         self.settings = get_settings()
-        if not os.environ.get("ECCODES_DEFINITION_PATH"):
-            os.environ["ECCODES_DEFINITION_PATH"] = self.settings.eccodes_definition_path
-        if not os.environ.get("ECCODES_SAMPLES_PATH"):
-            os.environ["ECCODES_SAMPLES_PATH"] = self.settings.eccodes_samples_path
         self._s3_client = None
         self._precip_cache: dict = {}
         self._cache_time: Optional[datetime] = None
         self._cache_ttl = timedelta(minutes=5)
+        self._refresh_flight = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stop_refresh: Optional[asyncio.Event] = None
+        # Decoded timestamped HTTP grids keyed by URL; a CONUS grid is ~100 MB, so
+        # bound the cache by total size as well as entry count
+        self._grib_cache = LRUCache(max_entries=16, ttl_seconds=15 * 60, max_bytes=1_500_000_000)
+        self._disk_cache = DiskArrayCache(
+            self.settings.grib_cache_dir, self.settings.grib_cache_max_mb * 1024 * 1024
+        )
 
     @property
     def s3_client(self):
@@ -75,6 +83,11 @@ class MRMSService:
             )
         return self._s3_client
 
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        """When the precipitation grids were last refreshed, or None before the first fetch."""
+        return self._cache_time
+
     def _is_cache_valid(self) -> bool:
         """Check if cached data is still valid."""
         if self._cache_time is None:
@@ -83,64 +96,66 @@ class MRMSService:
 
     async def get_latest_file_key(self, product: str) -> Optional[str]:
         """Get the key of the most recent MRMS file for a product."""
-        # MRMS files are organized by product/MRMS_{product}_{level}_{timestamp}.grib2.gz
+        # MRMS files are organized by product/MRMS_{product}_{level}_{timestamp}.grib2.gz,
+        # so keys sort by time. S3 lists keys in ascending order, so MaxKeys=1 would
+        # return the oldest key; instead list only the window after a recent
+        # StartAfter key and take the last one
         prefix = f"CONUS/{product}/"
+        now = datetime.now(timezone.utc)
+        lookback = timedelta(minutes=self.S3_LOOKBACK_INTERVALS * self._s3_interval_minutes(product))
 
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.settings.mrms_bucket,
-                Prefix=prefix,
-                MaxKeys=100,
-            )
-
-            if "Contents" not in response:
-                return None
-
-            # Sort by LastModified to get most recent
-            files = sorted(
-                response["Contents"],
-                key=lambda x: x["LastModified"],
-                reverse=True,
-            )
-
-            # Return most recent .grib2.gz file
-            for f in files:
-                if f["Key"].endswith(".grib2.gz"):
-                    return f["Key"]
-
+            # Widen to a day if the short window is empty (e.g. upload lag)
+            for window in (lookback, timedelta(days=1)):
+                start_after = f"{prefix}MRMS_{product}_00.00_{(now - window).strftime('%Y%m%d-%H%M%S')}"
+                key = await self._last_key_after(prefix, start_after)
+                if key:
+                    return key
             return None
 
         except Exception as e:
             print(f"Error listing MRMS files: {e}")
             return None
 
+    async def _last_key_after(self, prefix: str, start_after: str) -> Optional[str]:
+        s3_client = self.s3_client
+        params = {"Bucket": self.settings.mrms_bucket, "Prefix": prefix, "StartAfter": start_after}
+        last_key = None
+        while True:
+            response = await asyncio.to_thread(s3_client.list_objects_v2, **params)
+            for f in reversed(response.get("Contents", [])):
+                if f["Key"].endswith(".grib2.gz"):
+                    last_key = f["Key"]
+                    break
+            if not response.get("IsTruncated"):
+                return last_key
+            params["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _s3_interval_minutes(self, product: str) -> int:
+        for product_key, product_name in self.PRODUCTS.items():
+            if product_name == product:
+                return self.HTTP_INTERVAL_MINUTES.get(product_key, 60)
+        return 60
+
     async def download_and_parse_grib(self, key: str) -> Optional[np.ndarray]:
         """Download a GRIB2 file from S3 and parse it."""
+        # Only the latest S3 keys are fetched here and _precip_cache already
+        # holds the current grids, so they bypass the decoded-grid cache.
+        # boto3 downloads and GRIB decoding block, so keep them off the event loop
+        return await asyncio.to_thread(self._download_and_parse_grib_sync, self.s3_client, key)
+
+    def _download_and_parse_grib_sync(self, s3_client, key: str) -> Optional[np.ndarray]:
         try:
-            with tempfile.NamedTemporaryFile(suffix=".grib2.gz", delete=False) as tmp_gz:
-                self.s3_client.download_file(
-                    self.settings.mrms_bucket,
-                    key,
-                    tmp_gz.name,
-                )
-
-                # Decompress
-                grib_path = tmp_gz.name.replace(".gz", "")
-                with gzip.open(tmp_gz.name, "rb") as gz_file:
-                    with open(grib_path, "wb") as grib_file:
-                        grib_file.write(gz_file.read())
-
-                # Parse GRIB2
-                grbs = pygrib.open(grib_path)
-                grb = grbs[1]  # First message
-                data = grb.values
-
-                # Clean up
-                grbs.close()
-                Path(tmp_gz.name).unlink(missing_ok=True)
-                Path(grib_path).unlink(missing_ok=True)
-
-                return data
+            # Stream the body straight into the decompressor rather than
+            # spilling the gzip file to disk first
+            response = s3_client.get_object(Bucket=self.settings.mrms_bucket, Key=key)
+            body = response["Body"]
+            try:
+                data, _ = read_first_message_from_gzip_stream(body)
+            finally:
+                body.close()
+
+            return self._zero_missing(data)
 
         except Exception as e:
             print(f"Error downloading/parsing GRIB: {e}")
@@ -148,40 +163,46 @@ class MRMSService:
 
     async def download_and_parse_grib_http(self, url: str) -> Optional[np.ndarray]:
         """Download a GRIB2 file over HTTP and parse it."""
+        # "latest" URLs are overwritten in place, so only timestamped files are cached
+        if ".latest." in url:
+            return await self._fetch_and_parse_grib_http(url)
+        return await self._grib_cache.get_or_set(
+            url, lambda: self._fetch_and_parse_grib_http(url, persist=True)
+        )
+
+    async def _fetch_and_parse_grib_http(self, url: str, persist: bool = False) -> Optional[np.ndarray]:
+        if persist:
+            cached = await asyncio.to_thread(self._disk_cache.load, url)
+            if cached is not None:
+                return cached
+
         try:
-            is_gzip = url.endswith(".gz")
-            suffix = ".grib2.gz" if is_gzip else ".grib2"
-            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(url, timeout=30.0)
-                    response.raise_for_status()
-                    content_type = response.headers.get("Content-Type", "")
-                    if "gzip" not in content_type and "octet-stream" not in content_type:
-                        return None
-                    tmp_file.write(response.content)
-
-                if is_gzip:
-                    grib_path = tmp_file.name.replace(".gz", "")
-                    with gzip.open(tmp_file.name, "rb") as gz_file:
-                        with open(grib_path, "wb") as grib_file:
-                            grib_file.write(gz_file.read())
-                else:
-                    grib_path = tmp_file.name
-
-                grbs = pygrib.open(grib_path)
-                grb = grbs[1]
-                data = grb.values
-
-                grbs.close()
-                Path(tmp_file.name).unlink(missing_ok=True)
-                if grib_path != tmp_file.name:
-                    Path(grib_path).unlink(missing_ok=True)
-
-                return data
+            client = get_http_client()
+            response = await client.get(url, timeout=30.0)
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if "gzip" not in content_type and "octet-stream" not in content_type:
+                return None
+
+            # Decompression and GRIB decoding block, so keep them off the event loop
+            data = await asyncio.to_thread(self._decode, response.content, url.endswith(".gz"))
+            if persist:
+                await asyncio.to_thread(self._disk_cache.save, url, data)
+            return data
         except Exception as e:
             print(f"Error downloading/parsing GRIB via HTTP: {e}")
             return None
 
+    def _decode(self, content: bytes, is_gzip: bool) -> np.ndarray:
+        data, _ = read_first_message(content, is_gzip)
+        return self._zero_missing(data)
+
+    def _zero_missing(self, data: np.ndarray) -> np.ndarray:
+        """Zero missing-data values in place so lookups need no sentinel checks."""
+        # MRMS uses large negative values for missing data
+        np.putmask(data, (data < 0) | (data > 1000), 0.0)
+        return data
+
     def _build_http_url(self, product: str, timestamp: datetime) -> str:
         ts = timestamp.strftime("%Y%m%d-%H%M%S")
         return (
@@ -215,29 +236,44 @@ class MRMSService:
         if not http_product:
             return None
 
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            for offset in offsets:
-                candidate = base_time + timedelta(minutes=offset)
-                if base_source == "archive":
-                    url = self._build_archive_url(http_product, candidate)
-                else:
-                    url = self._build_http_url(http_product, candidate)
-                try:
-                    if base_source == "archive":
-                        probe = await client.get(
-                            url, headers={"Range": "bytes=0-0"}, timeout=15.0
-                        )
-                        if probe.status_code in (200, 206):
-                            return url
-                    else:
-                        head = await client.head(url, timeout=10.0)
-                        if head.status_code == 200:
-                            return url
-                except Exception:
-                    continue
+        urls = []
+        for offset in offsets:
+            candidate = base_time + timedelta(minutes=offset)
+            if base_source == "archive":
+                urls.append(self._build_archive_url(http_product, candidate))
+            else:
+                urls.append(self._build_http_url(http_product, candidate))
+
+        # Probe a batch of candidates at once, but take the first hit in offset
+        # order so the nearest file still wins
+        for start in range(0, len(urls), self.PROBE_BATCH_SIZE):
+            batch = urls[start:start + self.PROBE_BATCH_SIZE]
+            tasks = [asyncio.create_task(self._probe_http_file(url, base_source)) for url in batch]
+            try:
+                for url, task in zip(batch, tasks):
+                    if await task:
+                        return url
+            finally:
+                for task in tasks:
+                    task.cancel()
 
         return None
 
+    async def _probe_http_file(self, url: str, base_source: str) -> bool:
+        """Check whether an MRMS HTTP file exists."""
+        client = get_http_client()
+        try:
+            # A single-byte range GET works on servers that mishandle HEAD and
+            # never pulls the whole file
+            probe = await client.get(
+                url,
+                headers=self.PROBE_RANGE_HEADERS,
+                timeout=15.0 if base_source == "archive" else 10.0,
+            )
+            return probe.status_code in (200, 206)
+        except Exception:
+            return False
+
     def _latlon_to_grid_index(self, lat: float, lon: float) -> tuple[int, int]:
         """Convert lat/lon to MRMS grid indices."""
         # MRMS grid is north-up, so we need to flip latitude
@@ -250,6 +286,45 @@ class MRMSService:
 
         return lat_idx, lon_idx
 
+    def _latlon_to_grid_index_np(
+        self, lats: np.ndarray, lons: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Convert arrays of lat/lon to MRMS grid indices."""
+        lat_idx = ((self.MRMS_LAT_MAX - lats) / self.MRMS_RESOLUTION).astype(np.int64)
+        lon_idx = ((lons - self.MRMS_LON_MIN) / self.MRMS_RESOLUTION).astype(np.int64)
+
+        return np.clip(lat_idx, 0, 3499), np.clip(lon_idx, 0, 6999)
+
+    def _sample_inches(
+        self, data: Optional[np.ndarray], lat_idx: np.ndarray, lon_idx: np.ndarray
+    ) -> np.ndarray:
+        """Gather grid values at the given indices and convert mm to inches."""
+        if data is None:
+            return np.zeros(len(lat_idx))
+
+        try:
+            values = data[lat_idx, lon_idx].astype(float)
+        except IndexError:
+            return np.zeros(len(lat_idx))
+
+        return values / 25.4
+
+    def _with_station_precipitation(
+        self, stations_df: pd.DataFrame, precip_data: dict[str, Optional[np.ndarray]]
+    ) -> pd.DataFrame:
+        """Return a copy of stations_df with precipitation columns sampled from the grids."""
+        lat_idx, lon_idx = self._latlon_to_grid_index_np(
+            stations_df["latitude"].to_numpy(dtype=float),
+            stations_df["longitude"].to_numpy(dtype=float),
+        )
+
+        result_df = stations_df.copy()
+        result_df["precip_rate_in_hr"] = self._sample_inches(precip_data.get("precip_rate"), lat_idx, lon_idx)
+        result_df["accum_1hr_in"] = self._sample_inches(precip_data.get("qpe_01h"), lat_idx, lon_idx)
+        result_df["accum_6hr_in"] = self._sample_inches(precip_data.get("qpe_06h"), lat_idx, lon_idx)
+
+        return result_df
+
     def get_value_at_location(
         self, data: np.ndarray, lat: float, lon: float
     ) -> Optional[float]:
@@ -260,14 +335,26 @@ class MRMSService:
         lat_idx, lon_idx = self._latlon_to_grid_index(lat, lon)
 
         try:
-            value = float(data[lat_idx, lon_idx])
-            # MRMS uses large negative values for missing data
-            if value < 0 or value > 1000:
-                return 0.0
-            return value
+            return float(data[lat_idx, lon_idx])
         except (IndexError, ValueError):
             return None
 
+    async def _fetch_latest_product(
+        self, product_key: str, product_name: str
+    ) -> Optional[np.ndarray]:
+        """Fetch the most recent grid for one product from S3, falling back to HTTP."""
+        file_key = await self.get_latest_file_key(product_name)
+        if file_key:
+            return await self.download_and_parse_grib(file_key)
+
+        # Fallback to HTTP latest file if S3 listing fails
+        http_product = self.HTTP_PRODUCTS.get(product_key)
+        if http_product:
+            url = f"{self.settings.mrms_http_base_url}/{http_product}/MRMS_{http_product}.latest.grib2.gz"
+            return await self.download_and_parse_grib_http(url)
+
+        return None
+
     async def fetch_precipitation_data(
         self, force_refresh: bool = False
     ) -> dict[str, Optional[np.ndarray]]:
@@ -275,101 +362,97 @@ class MRMSService:
         if not force_refresh and self._is_cache_valid():
             return self._precip_cache
 
-        result = {}
+        # Concurrent callers that find the cache stale share one refresh
+        # instead of each downloading every product
+        return await self._refresh_flight.run("latest", self._refresh_precipitation_data)
 
-        for product_key, product_name in self.PRODUCTS.items():
-            file_key = await self.get_latest_file_key(product_name)
-            if file_key:
-                data = await self.download_and_parse_grib(file_key)
-                result[product_key] = data
-                continue
-
-            # Fallback to HTTP latest file if S3 listing fails
-            http_product = self.HTTP_PRODUCTS.get(product_key)
-            if http_product:
-                url = f"{self.settings.mrms_http_base_url}/{http_product}/MRMS_{http_product}.latest.grib2.gz"
-                data = await self.download_and_parse_grib_http(url)
-                result[product_key] = data
-            else:
-                result[product_key] = None
+    async def _refresh_precipitation_data(self) -> dict[str, Optional[np.ndarray]]:
+        # Products are independent, so download them in parallel
+        grids = await asyncio.gather(
+            *(
+                self._fetch_latest_product(product_key, product_name)
+                for product_key, product_name in self.PRODUCTS.items()
+            )
+        )
+        result = dict(zip(self.PRODUCTS.keys(), grids))
 
         self._precip_cache = result
         self._cache_time = datetime.now(timezone.utc)
 
         return result
 
+    def start_background_refresh(self) -> None:
+        """Start refreshing the latest grids ahead of expiry (once per event loop)."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._stop_refresh = asyncio.Event()
+        self._refresh_task = asyncio.create_task(self._background_refresher(self._stop_refresh))
+
+    async def stop_background_refresh(self) -> None:
+        """Stop the background refresher and wait for it to exit."""
+        if self._refresh_task is None:
+            return
+        self._stop_refresh.set()
+        self._refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._refresh_task
+        self._refresh_task = None
+
+    async def _background_refresher(self, stop: asyncio.Event) -> None:
+        # Refreshing just before the TTL runs out means on-demand callers keep
+        # finding a valid cache instead of waiting on a download
+        while not stop.is_set():
+            if self._seconds_until_refresh() <= 0:
+                try:
+                    await self.fetch_precipitation_data(force_refresh=True)
+                except Exception as e:
+                    print(f"Error refreshing MRMS data: {e}")
+
+            # Never retry a refresh that failed or left the cache stale in a tight loop
+            delay = max(self._seconds_until_refresh(), self.REFRESH_LEAD_SECONDS)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+
+    def _seconds_until_refresh(self) -> float:
+        if self._cache_time is None:
+            return 0.0
+        due = self._cache_time + self._cache_ttl - timedelta(seconds=self.REFRESH_LEAD_SECONDS)
+        return (due - datetime.now(timezone.utc)).total_seconds()
+
     async def fetch_precipitation_data_at_time(
         self, target_time: datetime
     ) -> dict[str, Optional[np.ndarray]]:
         """Fetch MRMS precipitation products closest to a target UTC time via HTTP."""
-        result: dict[str, Optional[np.ndarray]] = {}
-        for product_key in self.HTTP_PRODUCTS.keys():
-            url = await self._find_nearest_http_file(product_key, target_time, base_source="archive")
-            if url:
-                data = await self.download_and_parse_grib_http(url)
-                result[product_key] = data
-            else:
-                result[product_key] = None
-        return result
+        grids = await asyncio.gather(
+            *(
+                self._fetch_product_at_time(product_key, target_time)
+                for product_key in self.HTTP_PRODUCTS.keys()
+            )
+        )
+        return dict(zip(self.HTTP_PRODUCTS.keys(), grids))
+
+    async def _fetch_product_at_time(
+        self, product_key: str, target_time: datetime
+    ) -> Optional[np.ndarray]:
+        """Fetch the archived grid for one product nearest to target_time."""
+        url = await self._find_nearest_http_file(product_key, target_time, base_source="archive")
+        if url:
+            return await self.download_and_parse_grib_http(url)
+        return None
 
     async def get_station_precipitation_at_time(
         self, stations_df: pd.DataFrame, target_time: datetime
     ) -> pd.DataFrame:
         """Get precipitation data for all stations at a specific time (UTC)."""
         precip_data = await self.fetch_precipitation_data_at_time(target_time)
-
-        precip_rates = []
-        accum_1hr = []
-        accum_6hr = []
-
-        for _, row in stations_df.iterrows():
-            lat = row["latitude"]
-            lon = row["longitude"]
-
-            rate = self.get_value_at_location(precip_data.get("precip_rate"), lat, lon)
-            qpe_1h = self.get_value_at_location(precip_data.get("qpe_01h"), lat, lon)
-            qpe_6h = self.get_value_at_location(precip_data.get("qpe_06h"), lat, lon)
-
-            precip_rates.append(rate / 25.4 if rate else 0.0)
-            accum_1hr.append(qpe_1h / 25.4 if qpe_1h else 0.0)
-            accum_6hr.append(qpe_6h / 25.4 if qpe_6h else 0.0)
-
-        result_df = stations_df.copy()
-        result_df["precip_rate_in_hr"] = precip_rates
-        result_df["accum_1hr_in"] = accum_1hr
-        result_df["accum_6hr_in"] = accum_6hr
-
-        return result_df
+        return self._with_station_precipitation(stations_df, precip_data)
 
     async def get_station_precipitation(
         self, stations_df: pd.DataFrame
     ) -> pd.DataFrame:
         """Get precipitation data for all stations."""
         precip_data = await self.fetch_precipitation_data()
-
-        precip_rates = []
-        accum_1hr = []
-        accum_6hr = []
-
-        for _, row in stations_df.iterrows():
-            lat = row["latitude"]
-            lon = row["longitude"]
-
-            rate = self.get_value_at_location(precip_data.get("precip_rate"), lat, lon)
-            qpe_1h = self.get_value_at_location(precip_data.get("qpe_01h"), lat, lon)
-            qpe_6h = self.get_value_at_location(precip_data.get("qpe_06h"), lat, lon)
-
-            # Convert from mm/hr to in/hr and mm to inches
-            precip_rates.append(rate / 25.4 if rate else 0.0)
-            accum_1hr.append(qpe_1h / 25.4 if qpe_1h else 0.0)
-            accum_6hr.append(qpe_6h / 25.4 if qpe_6h else 0.0)
-
-        result_df = stations_df.copy()
-        result_df["precip_rate_in_hr"] = precip_rates
-        result_df["accum_1hr_in"] = accum_1hr
-        result_df["accum_6hr_in"] = accum_6hr
-
-        return result_df
+        return self._with_station_precipitation(stations_df, precip_data)
 
     async def get_single_station_precipitation(
         self, lat: float, lon: float
@@ -390,7 +473,8 @@ class MRMSService:
     async def is_available(self) -> bool:
         """Check if MRMS data is available."""
         try:
-            response = self.s3_client.list_objects_v2(
+            response = await asyncio.to_thread(
+                self.s3_client.list_objects_v2,
                 Bucket=self.settings.mrms_bucket,
                 Prefix="CONUS/PrecipRate/",
                 MaxKeys=1,
@@ -407,12 +491,12 @@ class MRMSService:
 
         url = f"{self.settings.mrms_http_base_url}/{http_product}/MRMS_{http_product}.latest.grib2.gz"
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                head = await client.head(url, timeout=10.0)
-                if head.status_code == 200:
-                    return True
-                response = await client.get(url, timeout=10.0)
-                return response.status_code == 200
+            client = get_http_client()
+            head = await client.head(url, timeout=10.0)
+            if head.status_code == 200:
+                return True
+            response = await client.get(url, headers=self.PROBE_RANGE_HEADERS, timeout=10.0)
+            return response.status_code in (200, 206)
         except Exception:
             return False
 
@@ -1,35 +1,62 @@
-import gzip
-import os
+import asyncio
 import re
-import tempfile
+import time
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Optional
 
-import httpx
 import numpy as np
 import pandas as pd
 
 from app.config import get_settings
+from app.services.http import get_http_client
+from app.utils.cache import DiskArrayCache, LRUCache, SingleFlight
+from app.utils.grib import read_first_message
+from app.utils.nearest import nearest_points
 
-settings = get_settings()
-if not os.environ.get("ECCODES_DEFINITION_PATH"):
-    os.environ["ECCODES_DEFINITION_PATH"] = settings.eccodes_definition_path
-if not os.environ.get("ECCODES_SAMPLES_PATH"):
-    os.environ["ECCODES_SAMPLES_PATH"] = settings.eccodes_samples_path
+# scipy is optional; without it nearest-grid lookups fall back to a brute-force search
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
 
-import pygrib
+_HREF_RE = re.compile(r'href="([^"]+)"')
+_EXT_RE = re.compile(r"\.(grb2?|grib2?|gz)$")
+_TS_RE = re.compile(r"(\d{10,14})")
+_DOT_RE = re.compile(r"(\d{8})[._-](\d{2})")
+# strptime format for each bare timestamp length
+_TS_FORMATS = {10: "%Y%m%d%H", 12: "%Y%m%d%H%M", 14: "%Y%m%d%H%M%S"}
 
 
 class Stage4Service:
     """Service for fetching historical NCEP Stage IV hourly precipitation from IEM archive."""
 
-    FILE_EXTENSIONS = (".grb", ".grb2", ".grib", ".grib2", ".grb2.gz", ".grib2.gz", ".gz")
+    # Listings (and nearest-file lookups built on them) are reused for this
+    # long; empty results expire sooner so archive lag is retried
+    LISTING_TTL_SECONDS = 300
+    EMPTY_LISTING_TTL_SECONDS = 30
+    MAX_NEAREST_CACHE_ENTRIES = 512
+    # A native 6-hour file must end this close to the target time to be used
+    SIX_HOUR_FILE_TOLERANCE = timedelta(minutes=30)
 
     def __init__(self):
         self.settings = get_settings()
-        self._dir_cache: dict[str, list[str]] = {}
+        self._dir_cache: dict[str, tuple[float, list[str]]] = {}
+        self._dir_flights = SingleFlight()
+        self._nearest_cache: dict[
+            tuple[datetime, Optional[str]], tuple[float, Optional[tuple[datetime, str]]]
+        ] = {}
         self._grid_cache: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # Per-grid nearest-neighbour index: (tree over finite points, or the
+        # points themselves without scipy, their flat grid indices, whether
+        # grid longitudes run 0-360)
+        self._kdtree_cache: dict[str, tuple[object, np.ndarray, bool]] = {}
+        # Decoded hourly grids keyed by filename; consecutive 6-hour windows
+        # share most of their files
+        self._grib_cache = LRUCache(max_entries=16, ttl_seconds=15 * 60, max_bytes=1_500_000_000)
+        # Grids and the shared lat/lon arrays persisted across restarts
+        self._disk_cache = DiskArrayCache(
+            self.settings.grib_cache_dir, self.settings.grib_cache_max_mb * 1024 * 1024
+        )
 
     def _archive_dirs(self, date: datetime) -> list[str]:
         bases = [self.settings.stage4_archive_base_url]
@@ -40,45 +67,57 @@ class Stage4Service:
             for base in bases
         ]
 
+    def _is_fresh(self, entry: Optional[tuple[float, object]]) -> bool:
+        if entry is None:
+            return False
+        ttl = self.LISTING_TTL_SECONDS if entry[1] else self.EMPTY_LISTING_TTL_SECONDS
+        return time.monotonic() - entry[0] < ttl
+
     async def _list_dir(self, date: datetime) -> list[str]:
         key = date.strftime("%Y-%m-%d")
-        if key in self._dir_cache:
-            return self._dir_cache[key]
+        entry = self._dir_cache.get(key)
+        if self._is_fresh(entry):
+            return entry[1]
+
+        # Concurrent hourly lookups usually share a date; list it only once
+        return await self._dir_flights.run(key, lambda: self._fetch_dir(date, key))
 
+    async def _fetch_dir(self, date: datetime, key: str) -> list[str]:
         urls = self._archive_dirs(date)
         text = ""
         for url in urls:
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(
-                        url,
-                        headers={"User-Agent": "mta-flood-api"},
-                        timeout=20.0,
-                    )
-                    if response.status_code == 200 and response.text:
-                        text = response.text
-                        break
+                client = get_http_client()
+                response = await client.get(
+                    url,
+                    headers={"User-Agent": "mta-flood-api"},
+                    timeout=20.0,
+                )
+                if response.status_code == 200 and response.text:
+                    text = response.text
+                    break
             except Exception as e:
                 print(f"Stage IV directory fetch failed for {url}: {e}")
 
         # Extract href targets
-        links = re.findall(r'href="([^"]+)"', text)
-        files = [link for link in links if link.endswith(self.FILE_EXTENSIONS)]
-        self._dir_cache[key] = files
+        links = _HREF_RE.findall(text)
+        files = [link for link in links if _EXT_RE.search(link)]
+        self._dir_cache[key] = (time.monotonic(), files)
         return files
 
     def _parse_time_from_name(self, name: str) -> Optional[datetime]:
         # Try to find a timestamp in the filename
-        candidates = re.findall(r"(\d{10,14})", name)
-        for c in candidates:
-            for fmt in ("%Y%m%d%H", "%Y%m%d%H%M", "%Y%m%d%H%M%S"):
-                try:
-                    return datetime.strptime(c, fmt).replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
+        for c in _TS_RE.findall(name):
+            fmt = _TS_FORMATS.get(len(c))
+            if fmt is None:
+                continue
+            try:
+                return datetime.strptime(c, fmt).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
 
         # Try patterns like YYYYMMDD.HH
-        match = re.search(r"(\d{8})[._-](\d{2})", name)
+        match = _DOT_RE.search(name)
         if match:
             try:
                 dt = datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H")
@@ -88,7 +127,33 @@ class Stage4Service:
 
         return None
 
-    async def _find_nearest_file(self, target_time: datetime) -> Optional[tuple[datetime, str]]:
+    async def _find_nearest_file(
+        self, target_time: datetime, suffix: Optional[str] = None
+    ) -> Optional[tuple[datetime, str]]:
+        # Overlapping 6-hour windows ask for the same hours again. Lookups are
+        # made for the nearest whole hour so requests at any minute share an entry
+        hour = (target_time + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
+        key = (hour, suffix)
+        entry = self._nearest_cache.get(key)
+        if self._is_fresh(entry):
+            return entry[1]
+
+        nearest = await self._scan_nearest_file(hour, suffix)
+        self._nearest_cache.pop(key, None)
+        if len(self._nearest_cache) >= self.MAX_NEAREST_CACHE_ENTRIES:
+            self._nearest_cache = {
+                k: value for k, value in self._nearest_cache.items() if self._is_fresh(value)
+            }
+            # Still full of live entries: drop the oldest (dicts keep insertion order)
+            while len(self._nearest_cache) >= self.MAX_NEAREST_CACHE_ENTRIES:
+                self._nearest_cache.pop(next(iter(self._nearest_cache)))
+        self._nearest_cache[key] = (time.monotonic(), nearest)
+        return nearest
+
+    async def _scan_nearest_file(
+        self, target_time: datetime, suffix: Optional[str] = None
+    ) -> Optional[tuple[datetime, str]]:
+        """Find the file whose timestamp is closest to target_time, optionally only '.<suffix>.' files."""
         # Stage IV archive is organized by UTC date
         files = await self._list_dir(target_time)
         if not files:
@@ -104,6 +169,8 @@ class Stage4Service:
         closest = None
         closest_delta = None
         for name in files:
+            if suffix and f".{suffix}." not in name:
+                continue
             ts = self._parse_time_from_name(name)
             if not ts:
                 continue
@@ -116,128 +183,235 @@ class Stage4Service:
             return None
         return target_time, closest
 
+    async def _find_six_hour_file(self, target_time: datetime) -> Optional[tuple[datetime, str]]:
+        """Find a native 06h accumulation file ending at target_time, if one exists."""
+        nearest = await self._find_nearest_file(target_time, suffix="06h")
+        if nearest is None:
+            return None
+        ts = self._parse_time_from_name(nearest[1])
+        if ts is None or abs(ts - target_time) > self.SIX_HOUR_FILE_TOLERANCE:
+            return None
+        return nearest
+
     async def _download_and_parse(self, date: datetime, filename: str) -> Optional[np.ndarray]:
+        return await self._grib_cache.get_or_set(
+            filename, lambda: self._fetch_and_parse(date, filename)
+        )
+
+    async def _fetch_and_parse(self, date: datetime, filename: str) -> Optional[np.ndarray]:
+        persisted = await asyncio.to_thread(
+            self._load_persisted, filename, "stage4" not in self._grid_cache
+        )
+        if persisted is not None:
+            data, latlons = persisted
+            self._remember_grid(latlons)
+            return data
+
         url = None
         for base in self._archive_dirs(date):
             url = f"{base}{filename}"
             try:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    probe = await client.get(
-                        url, headers={"Range": "bytes=0-0"}, timeout=10.0
-                    )
-                    if probe.status_code in (200, 206):
-                        break
+                client = get_http_client()
+                probe = await client.get(
+                    url, headers={"Range": "bytes=0-0"}, timeout=10.0
+                )
+                if probe.status_code in (200, 206):
+                    break
             except Exception:
                 continue
         if not url:
             return None
         try:
-            is_gzip = filename.endswith(".gz")
-            suffix = ".grib2.gz" if is_gzip else ".grib2"
-            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-                async with httpx.AsyncClient(follow_redirects=True) as client:
-                    response = await client.get(url, timeout=30.0)
-                    response.raise_for_status()
-                    tmp_file.write(response.content)
-
-                if is_gzip:
-                    grib_path = tmp_file.name.replace(".gz", "")
-                    with gzip.open(tmp_file.name, "rb") as gz_file:
-                        with open(grib_path, "wb") as grib_file:
-                            grib_file.write(gz_file.read())
-                else:
-                    grib_path = tmp_file.name
-
-                grbs = pygrib.open(grib_path)
-                grb = grbs[1]
-                data = grb.values
-
-                # Cache grid lat/lon
-                if grib_path not in self._grid_cache:
-                    lats, lons = grb.latlons()
-                    self._grid_cache["stage4"] = (lats, lons)
-
-                grbs.close()
-                Path(tmp_file.name).unlink(missing_ok=True)
-                if grib_path != tmp_file.name:
-                    Path(grib_path).unlink(missing_ok=True)
-
-                return data
+            client = get_http_client()
+            response = await client.get(url, timeout=30.0)
+            response.raise_for_status()
+
+            # Every Stage IV file shares the same grid, so only read lat/lon once.
+            # Decompression and GRIB decoding block, so keep them off the event loop
+            data, latlons = await asyncio.to_thread(
+                self._decode,
+                response.content,
+                filename.endswith(".gz"),
+                "stage4" not in self._grid_cache,
+            )
+            self._remember_grid(latlons)
+            await asyncio.to_thread(self._persist, filename, data, latlons)
+
+            return data
         except Exception as e:
             print(f"Error fetching Stage IV file {filename}: {e}")
             return None
 
-    def _nearest_indices(self, lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> tuple[int, int]:
-        # Brute-force nearest neighbor on grid
-        if np.nanmax(lons) > 180 and lon < 0:
-            lon = lon + 360
-        dist = (lats - lat) ** 2 + (lons - lon) ** 2
-        idx = np.unravel_index(np.nanargmin(dist), dist.shape)
-        return int(idx[0]), int(idx[1])
+    def _remember_grid(self, latlons: Optional[tuple[np.ndarray, np.ndarray]]) -> None:
+        if latlons is not None and "stage4" not in self._grid_cache:
+            self._grid_cache["stage4"] = latlons
+            self._kdtree_cache.pop("stage4", None)
+
+    def _load_persisted(
+        self, filename: str, with_latlons: bool
+    ) -> Optional[tuple[np.ndarray, Optional[tuple[np.ndarray, np.ndarray]]]]:
+        """Load a decoded grid from disk (plus lat/lon if requested), or None on any miss."""
+        data = self._disk_cache.load(f"stage4/{filename}")
+        if data is None:
+            return None
+        if not with_latlons:
+            return data, None
+        lats = self._disk_cache.load("stage4/lats")
+        lons = self._disk_cache.load("stage4/lons")
+        if lats is None or lons is None:
+            return None
+        return data, (lats, lons)
+
+    def _persist(
+        self, filename: str, data: np.ndarray, latlons: Optional[tuple[np.ndarray, np.ndarray]]
+    ) -> None:
+        self._disk_cache.save(f"stage4/{filename}", data)
+        if latlons is not None:
+            self._disk_cache.save("stage4/lats", latlons[0])
+            self._disk_cache.save("stage4/lons", latlons[1])
+
+    def _get_kdtree(self) -> tuple[object, np.ndarray, bool]:
+        """Build (once) a KD-tree over the cached Stage IV grid points."""
+        cached = self._kdtree_cache.get("stage4")
+        if cached is None:
+            lats, lons = self._grid_cache["stage4"]
+            points = np.column_stack([lats.ravel(), lons.ravel()])
+            finite = np.flatnonzero(np.isfinite(points).all(axis=1))
+            index = cKDTree(points[finite]) if cKDTree is not None else points[finite]
+            cached = (index, finite, bool(np.nanmax(lons) > 180))
+            self._kdtree_cache["stage4"] = cached
+        return cached
+
+    def _nearest_indices_batch(
+        self, lats_q: np.ndarray, lons_q: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Nearest Stage IV grid indices for many lat/lon points in one query."""
+        index, finite, lons_0_360 = self._get_kdtree()
+        if lons_0_360:
+            lons_q = np.where(lons_q < 0, lons_q + 360, lons_q)
+        if cKDTree is not None:
+            _, nearest = index.query(np.column_stack([lats_q, lons_q]), k=1)
+        else:
+            nearest = nearest_points(index[:, 0], index[:, 1], lats_q, lons_q)
+        return np.unravel_index(finite[nearest], self._grid_cache["stage4"][0].shape)
+
+    def _decode(self, content: bytes, is_gzip: bool, with_latlons: bool):
+        data, latlons = read_first_message(content, is_gzip, with_latlons)
+        # Clamp negative (missing) totals once so lookups need no checks
+        np.putmask(data, data < 0, 0.0)
+        return data, latlons
+
+    def _sample_inches(self, data: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Gather hourly totals at grid indices and convert mm to inches."""
+        return data[i, j].astype(float) / 25.4
+
+    async def _download_unique_files(
+        self, resolved: list[tuple[datetime, str]]
+    ) -> dict[str, Optional[np.ndarray]]:
+        """Fetch each distinct resolved file once; files whose fetch raised are left out."""
+        unique: dict[str, datetime] = {}
+        for hour_date, hour_file in resolved:
+            unique.setdefault(hour_file, hour_date)
+
+        downloads = await asyncio.gather(
+            *(self._download_and_parse(hour_date, hour_file) for hour_file, hour_date in unique.items()),
+            return_exceptions=True,
+        )
+        grids = {}
+        for hour_file, hour_data in zip(unique, downloads):
+            if isinstance(hour_data, Exception):
+                print(f"Error fetching Stage IV file {hour_file}: {hour_data}")
+                continue
+            grids[hour_file] = hour_data
+        return grids
+
+    async def _resolve_hours(
+        self, hour_times: list[datetime]
+    ) -> list[tuple[datetime, tuple[datetime, str]]]:
+        """Nearest file for each hour, skipping hours with no file or a failed lookup."""
+        results = await asyncio.gather(
+            *(self._find_nearest_file(hour_time) for hour_time in hour_times),
+            return_exceptions=True,
+        )
+
+        hours = []
+        for hour_time, result in zip(hour_times, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching Stage IV hour {hour_time.isoformat()}: {result}")
+                continue
+            if result is not None:
+                hours.append((hour_time, result))
+        return hours
 
     async def get_station_precipitation_at_time(
         self, stations_df: pd.DataFrame, target_time: datetime
     ) -> tuple[pd.DataFrame, dict]:
         """Get hourly Stage IV precipitation for all stations at a specific UTC time."""
-        nearest = await self._find_nearest_file(target_time)
-        if not nearest:
+        # The target hour is hour 0 of the 6-hour accumulation, so resolve all
+        # six hours together. A native 06h file ending at the target time
+        # covers the whole window, so the other five are only fetched without one
+        hour_times = [target_time - timedelta(hours=h) for h in range(0, 6)]
+        six_hour, hours = await asyncio.gather(
+            self._find_six_hour_file(target_time),
+            self._resolve_hours(hour_times),
+        )
+        if not hours or hours[0][0] != target_time:
             raise RuntimeError("No Stage IV files found for target time")
 
-        file_date, filename = nearest
+        file_date, filename = hours[0][1]
         source_url = f"{self._archive_dirs(file_date)[0]}{filename}"
-        data = await self._download_and_parse(file_date, filename)
-        if data is None:
+
+        # Neighbouring hours can snap to the same file; fetch and sample it once
+        # and count it for every hour it covers
+        if six_hour is not None:
+            grids = await self._download_unique_files([hours[0][1], six_hour])
+            if grids.get(six_hour[1]) is None:
+                six_hour = None
+                grids.update(await self._download_unique_files([nearest for _, nearest in hours[1:]]))
+        else:
+            grids = await self._download_unique_files([nearest for _, nearest in hours])
+
+        if grids.get(filename) is None:
             raise RuntimeError("Stage IV file download/parse failed")
 
         lats, lons = self._grid_cache.get("stage4", (None, None))
         if lats is None or lons is None:
             raise RuntimeError("Stage IV grid coordinates not available")
 
-        precip_rates = []
-        accum_1hr = []
-
-        for _, row in stations_df.iterrows():
-            lat = row["latitude"]
-            lon = row["longitude"]
-            i, j = self._nearest_indices(lats, lons, lat, lon)
-            value = float(data[i, j])
-            if value < 0:
-                value = 0.0
-            # Stage IV hourly totals are in mm; convert to inches
-            inches = value / 25.4
-            precip_rates.append(inches)
-            accum_1hr.append(inches)
+        i, j = self._nearest_indices_batch(
+            stations_df["latitude"].to_numpy(dtype=float),
+            stations_df["longitude"].to_numpy(dtype=float),
+        )
+
+        # Stage IV totals are in mm; convert to inches
+        sampled = {
+            hour_file: self._sample_inches(hour_data, i, j)
+            for hour_file, hour_data in grids.items()
+            if hour_data is not None
+        }
+        inches = sampled[filename]
 
         result_df = stations_df.copy()
-        result_df["precip_rate_in_hr"] = precip_rates
-        result_df["accum_1hr_in"] = accum_1hr
-
-        # 6-hour accumulation: sum last 6 hourly files (best-effort)
-        accum_6hr = []
-        for _, row in stations_df.iterrows():
-            accum_6hr.append(0.0)
-
-        accum_source_urls = []
-        accum_source_times = []
-        for h in range(0, 6):
-            hour_time = target_time - timedelta(hours=h)
-            hour_nearest = await self._find_nearest_file(hour_time)
-            if not hour_nearest:
-                continue
-            hour_date, hour_file = hour_nearest
-            accum_source_urls.append(f"{self._archive_dirs(hour_date)[0]}{hour_file}")
-            accum_source_times.append(hour_time.isoformat())
-            hour_data = await self._download_and_parse(hour_date, hour_file)
-            if hour_data is None:
-                continue
-            for idx, (_, row) in enumerate(stations_df.iterrows()):
-                lat = row["latitude"]
-                lon = row["longitude"]
-                i, j = self._nearest_indices(lats, lons, lat, lon)
-                value = float(hour_data[i, j])
-                if value < 0:
-                    value = 0.0
-                accum_6hr[idx] += value / 25.4
+        result_df["precip_rate_in_hr"] = inches
+        result_df["accum_1hr_in"] = inches.copy()
+
+        if six_hour is not None:
+            six_hour_date, six_hour_file = six_hour
+            accum_6hr = sampled[six_hour_file]
+            accum_source_urls = [f"{self._archive_dirs(six_hour_date)[0]}{six_hour_file}"]
+            accum_source_times = [target_time.isoformat()]
+        else:
+            # 6-hour accumulation: sum last 6 hourly files (best-effort)
+            accum_6hr = np.zeros(len(stations_df))
+            accum_source_urls = []
+            accum_source_times = []
+            for hour_time, (hour_date, hour_file) in hours:
+                if hour_file not in grids:
+                    continue
+                accum_source_urls.append(f"{self._archive_dirs(hour_date)[0]}{hour_file}")
+                accum_source_times.append(hour_time.isoformat())
+                if hour_file in sampled:
+                    accum_6hr += sampled[hour_file]
 
         result_df["accum_6hr_in"] = accum_6hr
         meta = {
@@ -248,5 +422,4 @@ class Stage4Service:
         }
         return result_df, meta
 
-
 stage4_service = Stage4Service()
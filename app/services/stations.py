@@ -2,10 +2,10 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import httpx
 import pandas as pd
 
-from app.config import COASTAL_STATIONS, get_settings
+from app.config import BOROUGH_MAP, COASTAL_STATIONS, get_settings
+from app.services.http import get_http_client
 
 
 class StationsService:
@@ -14,6 +14,7 @@ class StationsService:
     def __init__(self):
         self.settings = get_settings()
         self._stations_df: Optional[pd.DataFrame] = None
+        self._by_borough: dict[str, pd.DataFrame] = {}
 
     async def load_stations(self, force_refresh: bool = False) -> pd.DataFrame:
         """Load MTA stations from cache or download from MTA."""
@@ -25,26 +26,55 @@ class StationsService:
         return await self._download_and_cache(cache_path)
 
     def _load_from_cache(self, cache_path: Path) -> pd.DataFrame:
-        """Load stations from local cache."""
+        """Load stations from local cache, preferring the parsed Parquet copy."""
+        parquet_path = cache_path.with_suffix(".parquet")
+        if parquet_path.exists() and parquet_path.stat().st_mtime >= cache_path.stat().st_mtime:
+            try:
+                return self._set_stations(pd.read_parquet(parquet_path))
+            except Exception as e:
+                print(f"Error reading stations Parquet cache: {e}")
+
         df = pd.read_csv(cache_path)
-        self._stations_df = self._normalize_dataframe(df)
+        self._write_parquet_cache(df, parquet_path)
+        return self._set_stations(df)
+
+    def _set_stations(self, raw_df: pd.DataFrame) -> pd.DataFrame:
+        # Normalization and derived fields are recomputed on every load so
+        # config changes (e.g. COASTAL_STATIONS) never need a cache reset
+        self._stations_df = self._normalize_dataframe(raw_df)
+        self._index_stations()
         return self._stations_df
 
+    def _index_stations(self) -> None:
+        """Precompute the per-borough station frames served by get_stations."""
+        df = self._stations_df
+        borough_full = df["borough"].map(BOROUGH_MAP).fillna(df["borough"]).str.lower()
+        self._by_borough = {
+            name: group for name, group in df.groupby(borough_full, sort=False)
+        }
+
+    def _write_parquet_cache(self, raw_df: pd.DataFrame, parquet_path: Path) -> None:
+        """Persist the parsed CSV so later startups skip CSV parsing."""
+        try:
+            raw_df.to_parquet(parquet_path, index=False)
+        except Exception as e:
+            print(f"Error writing stations Parquet cache: {e}")
+
     async def _download_and_cache(self, cache_path: Path) -> pd.DataFrame:
         """Download stations from MTA and cache locally."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.settings.mta_stations_url,
-                timeout=30.0
-            )
-            response.raise_for_status()
+        client = get_http_client()
+        response = await client.get(
+            self.settings.mta_stations_url,
+            timeout=30.0
+        )
+        response.raise_for_status()
 
         cache_path.parent.mkdir(parents=True, exist_ok=True)
         cache_path.write_text(response.text)
 
         df = pd.read_csv(cache_path)
-        self._stations_df = self._normalize_dataframe(df)
-        return self._stations_df
+        self._write_parquet_cache(df, cache_path.with_suffix(".parquet"))
+        return self._set_stations(df)
 
     def _normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize column names and add computed fields."""
@@ -72,32 +102,23 @@ class StationsService:
 
         df["station_id"] = df["station_id"].astype(str)
 
-        df["is_coastal"] = df["station_name"].apply(
-            lambda x: x in COASTAL_STATIONS if pd.notna(x) else False
-        )
+        df["is_coastal"] = df["station_name"].isin(COASTAL_STATIONS)
 
         return df
 
     async def get_stations(self, borough: Optional[str] = None) -> pd.DataFrame:
-        """Get stations, optionally filtered by borough."""
+        """
+        Get stations, optionally filtered by borough.
+
+        The returned frame is shared between callers; copy it before modifying.
+        """
         if self._stations_df is None:
             await self.load_stations()
 
-        df = self._stations_df.copy()
-
         if borough:
-            borough_map = {
-                "M": "Manhattan",
-                "Bk": "Brooklyn",
-                "Q": "Queens",
-                "Bx": "Bronx",
-                "SI": "Staten Island",
-            }
-            df["borough_full"] = df["borough"].map(borough_map).fillna(df["borough"])
-            df = df[df["borough_full"].str.lower() == borough.lower()]
-            df = df.drop(columns=["borough_full"])
+            return self._by_borough.get(borough.lower(), self._stations_df.iloc[0:0])
 
-        return df
+        return self._stations_df
 
     async def get_station_by_name(self, station_name: str) -> Optional[dict]:
         """Get a single station by name."""
@@ -1,9 +1,8 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import httpx
-
 from app.config import get_settings
+from app.services.http import get_http_client
 from app.models import TideReading
 
 
@@ -21,6 +20,11 @@ class TidesService:
         self._cache_time: Optional[datetime] = None
         self._cache_ttl = timedelta(minutes=6)  # NOAA updates every 6 minutes
 
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        """When the tide readings were last refreshed, or None before the first fetch."""
+        return self._cache_time
+
     def _is_cache_valid(self) -> bool:
         """Check if cached data is still valid."""
         if self._cache_time is None:
@@ -41,34 +45,34 @@ class TidesService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.noaa_tides_base_url,
-                    params=params,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                if "data" not in data or len(data["data"]) == 0:
-                    return None
-
-                reading = data["data"][0]
-                water_level = float(reading["v"])
-                timestamp_str = reading["t"]
-
-                # Parse NOAA timestamp format: "2026-01-23 14:30"
-                timestamp = datetime.strptime(
-                    timestamp_str, "%Y-%m-%d %H:%M"
-                ).replace(tzinfo=timezone.utc)
-
-                return TideReading(
-                    station_id=station_id,
-                    station_name=self.NOAA_STATIONS.get(station_id, station_id),
-                    water_level_ft=water_level,
-                    timestamp=timestamp,
-                    datum="MLLW",
-                )
+            client = get_http_client()
+            response = await client.get(
+                self.settings.noaa_tides_base_url,
+                params=params,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            if "data" not in data or len(data["data"]) == 0:
+                return None
+
+            reading = data["data"][0]
+            water_level = float(reading["v"])
+            timestamp_str = reading["t"]
+
+            # Parse NOAA timestamp format: "2026-01-23 14:30"
+            timestamp = datetime.strptime(
+                timestamp_str, "%Y-%m-%d %H:%M"
+            ).replace(tzinfo=timezone.utc)
+
+            return TideReading(
+                station_id=station_id,
+                station_name=self.NOAA_STATIONS.get(station_id, station_id),
+                water_level_ft=water_level,
+                timestamp=timestamp,
+                datum="MLLW",
+            )
 
         except Exception as e:
             print(f"Error fetching NOAA tide data for {station_id}: {e}")
@@ -83,33 +87,33 @@ class TidesService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.settings.usgs_water_url,
-                    params=params,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                results = []
-                time_series = data.get("value", {}).get("timeSeries", [])
-
-                for ts in time_series:
-                    site_code = ts.get("sourceInfo", {}).get("siteCode", [{}])[0].get("value")
-                    site_name = ts.get("sourceInfo", {}).get("siteName", "Unknown")
-                    values = ts.get("values", [{}])[0].get("value", [])
-
-                    if values:
-                        latest = values[-1]
-                        results.append({
-                            "site_id": site_code,
-                            "site_name": site_name,
-                            "water_level_ft": float(latest.get("value", 0)),
-                            "timestamp": latest.get("dateTime"),
-                        })
-
-                return results
+            client = get_http_client()
+            response = await client.get(
+                self.settings.usgs_water_url,
+                params=params,
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            results = []
+            time_series = data.get("value", {}).get("timeSeries", [])
+
+            for ts in time_series:
+                site_code = ts.get("sourceInfo", {}).get("siteCode", [{}])[0].get("value")
+                site_name = ts.get("sourceInfo", {}).get("siteName", "Unknown")
+                values = ts.get("values", [{}])[0].get("value", [])
+
+                if values:
+                    latest = values[-1]
+                    results.append({
+                        "site_id": site_code,
+                        "site_name": site_name,
+                        "water_level_ft": float(latest.get("value", 0)),
+                        "timestamp": latest.get("dateTime"),
+                    })
+
+            return results
 
         except Exception as e:
             print(f"Error fetching USGS water data: {e}")
@@ -160,14 +164,14 @@ class TidesService:
         for station_id in self.NOAA_STATIONS.keys():
             params["station"] = station_id
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        self.settings.noaa_tides_base_url,
-                        params=params,
-                        timeout=10.0,
-                    )
-                    response.raise_for_status()
-                    data = response.json()
+                client = get_http_client()
+                response = await client.get(
+                    self.settings.noaa_tides_base_url,
+                    params=params,
+                    timeout=10.0,
+                )
+                response.raise_for_status()
+                data = response.json()
 
                 data_points = data.get("data", [])
                 if not data_points:
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+import numpy as np
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one in-flight computation.
+
+    Callers that arrive while a computation is running await its result
+    instead of starting their own. Nothing is retained once it finishes.
+    """
+
+    def __init__(self):
+        self._pending: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory for key, or join the run already in progress."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shield so a cancelled waiter does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+
+
+class TTLCache:
+    """
+    In-memory cache for coroutine results that expire after a fixed TTL.
+
+    Concurrent misses for the same key share one in-flight computation, so a
+    burst of requests triggers a single upstream fetch. Exceptions are passed
+    to every waiter and are not cached.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl = ttl_seconds
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._flights = SingleFlight()
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, computing it with factory on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self._ttl:
+            return entry[1]
+
+        return await self._flights.run(key, lambda: self._fill(key, factory))
+
+    async def _fill(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        value = await factory()
+        self._entries[key] = (time.monotonic(), value)
+        return value
+
+
+class LRUCache:
+    """
+    Bounded in-memory cache for large values such as decoded GRIB grids.
+
+    Entries expire after a TTL and are dropped whenever a new value is
+    stored; the least recently used live ones are then evicted while either
+    the entry limit or the total byte limit (summed from each value's
+    nbytes) is exceeded. Concurrent misses for the same key share one
+    computation; None results are not cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._bytes = 0
+        self._flights = SingleFlight()
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, computing it with factory on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < self._ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._remove(key)
+
+        return await self._flights.run(key, lambda: self._fill(key, factory))
+
+    async def _fill(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        value = await factory()
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if key in self._entries:
+            self._remove(key)
+        now = time.monotonic()
+        # Keys that are never looked up again would otherwise hold their
+        # memory until the caps force them out
+        for stale_key in [k for k, (ts, _) in self._entries.items() if now - ts >= self._ttl]:
+            self._remove(stale_key)
+
+        self._entries[key] = (now, value)
+        self._bytes += getattr(value, "nbytes", 0)
+
+        while self._entries and (
+            len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= getattr(value, "nbytes", 0)
+
+
+class DiskArrayCache:
+    """
+    Arrays persisted as .npy files so decoded grids survive restarts.
+
+    Loads are memory-mapped read-only, so a hit costs no decode or copy.
+    Writes go to a temporary file that is renamed into place, and the least
+    recently used files are removed once the directory exceeds max_bytes. Disk errors are
+    logged and treated as misses. Methods block, so call them off the event
+    loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self._dir = Path(directory).expanduser() if directory else None
+        self._max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{hashlib.sha1(key.encode()).hexdigest()}.npy"
+
+    def load(self, key: str) -> Optional[np.ndarray]:
+        """Return the stored array for key memory-mapped, or None."""
+        if self._dir is None:
+            return None
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+            # Pruning goes by mtime, so a hit marks the file as recently used
+            os.utime(path)
+            return array
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Discarding unreadable cached array {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, key: str, array: np.ndarray) -> None:
+        """Store array for key, replacing any previous file atomically."""
+        if self._dir is None:
+            return
+        path = self._path(key)
+        tmp_path = None
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            # A unique temp file per writer, so concurrent saves of the same key
+            # each rename a complete file and the last one simply wins
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=self._dir)
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.save(tmp_file, array)
+            os.replace(tmp_path, path)
+            self._prune()
+        except Exception as e:
+            print(f"Error caching array to {path}: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def _prune(self) -> None:
+        files = []
+        for entry in os.scandir(self._dir):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if total <= self._max_bytes:
+                break
+            Path(file_path).unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,119 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator
+
+from app.models import FORECAST_SKIPPED_MARKER, RiskLevel, StationReport
+
+
+CSV_COLUMNS = [
+    "Date",
+    "Time",
+    "Time Zone",
+    "Station Line",
+    "Stop Name",
+    "Borough",
+    "CBD",
+    "Daytime Routes",
+    "Structure",
+    "GTFS Latitude",
+    "GTFS Longitude",
+    "Precip Rate (in/hr)",
+    "1hr Accumulation (in)",
+    "6hr Accumulation (in)",
+    "Tide Level (ft)",
+    "Central Park Daily (in)",
+    "Central Park Daily Date",
+    "JFK Daily (in)",
+    "JFK Daily Date",
+    "LaGuardia Daily (in)",
+    "LaGuardia Daily Date",
+    "Forecast 6hr (in)",
+    "Forecast 24hr (in)",
+    "Predicted Risk 6hr",
+    "Predicted Risk 24hr",
+    "Risk Level",
+    "Risk Reason",
+    "Source",
+]
+
+# Not fetched for stations already at FLOOD WARNING
+FORECAST_COLUMNS = [
+    "Forecast 6hr (in)",
+    "Forecast 24hr (in)",
+    "Predicted Risk 6hr",
+    "Predicted Risk 24hr",
+]
+
+
+def iter_csv_rows(
+    stations: list[StationReport],
+    report_date: str,
+    generated_at: datetime,
+) -> Iterator[bytes]:
+    """
+    Generate a CSV report one line at a time.
+
+    Yields the header followed by one UTF-8 encoded line per station, so the
+    report can be streamed without building the whole file in memory.
+    """
+    report_time = generated_at.strftime("%H:%M:%S")
+    time_zone = generated_at.tzname() if generated_at.tzinfo else "UTC"
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+
+    for station in stations:
+        buffer.seek(0)
+        buffer.truncate(0)
+        row = {
+            "Date": report_date,
+            "Time": report_time,
+            "Time Zone": time_zone,
+            "Station Line": station.line,
+            "Stop Name": station.station_name,
+            "Borough": station.borough,
+            "CBD": station.cbd,
+            "Daytime Routes": station.daytime_routes,
+            "Structure": station.structure,
+            "GTFS Latitude": station.latitude,
+            "GTFS Longitude": station.longitude,
+            "Precip Rate (in/hr)": round(station.precip_rate_in_hr or 0.0, 3),
+            "1hr Accumulation (in)": round(station.accum_1hr_in or 0.0, 3),
+            "6hr Accumulation (in)": round(station.accum_6hr_in or 0.0, 3),
+            "Tide Level (ft)": round(station.tide_level_ft, 2) if station.tide_level_ft else "",
+            "Central Park Daily (in)": round(station.central_park_daily_in, 3)
+            if station.central_park_daily_in is not None
+            else "",
+            "Central Park Daily Date": station.central_park_daily_date or "",
+            "JFK Daily (in)": round(station.jfk_daily_in, 3)
+            if station.jfk_daily_in is not None
+            else "",
+            "JFK Daily Date": station.jfk_daily_date or "",
+            "LaGuardia Daily (in)": round(station.lga_daily_in, 3)
+            if station.lga_daily_in is not None
+            else "",
+            "LaGuardia Daily Date": station.lga_daily_date or "",
+            "Forecast 6hr (in)": round(station.forecast_6hr_in, 3)
+            if station.forecast_6hr_in is not None
+            else "",
+            "Forecast 24hr (in)": round(station.forecast_24hr_in, 3)
+            if station.forecast_24hr_in is not None
+            else "",
+            "Predicted Risk 6hr": station.predicted_risk_6hr.value
+            if station.predicted_risk_6hr
+            else "",
+            "Predicted Risk 24hr": station.predicted_risk_24hr.value
+            if station.predicted_risk_24hr
+            else "",
+            "Risk Level": station.risk_level.value,
+            "Risk Reason": station.risk_reason or "",
+            "Source": station.source,
+        }
+        if station.risk_level == RiskLevel.HIGH:
+            row.update(dict.fromkeys(FORECAST_COLUMNS, FORECAST_SKIPPED_MARKER))
+        writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
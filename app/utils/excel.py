@@ -6,7 +6,8 @@ import pandas as pd
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 
-from app.models import StationReport
+from app.models import FORECAST_SKIPPED_MARKER, RiskLevel, StationReport
+from app.utils.csv_export import FORECAST_COLUMNS
 
 
 def generate_excel_report(
@@ -28,7 +29,7 @@ def generate_excel_report(
     # Convert to DataFrame
     data = []
     for station in stations:
-        data.append({
+        row = {
             "Date": report_date,
             "Time": generated_at.strftime("%H:%M:%S"),
             "Time Zone": generated_at.tzname() if generated_at.tzinfo else "UTC",
@@ -71,7 +72,10 @@ def generate_excel_report(
             "Risk Level": station.risk_level.value,
             "Risk Reason": station.risk_reason or "",
             "Source": station.source,
-        })
+        }
+        if station.risk_level == RiskLevel.HIGH:
+            row.update(dict.fromkeys(FORECAST_COLUMNS, FORECAST_SKIPPED_MARKER))
+        data.append(row)
 
     df = pd.DataFrame(data)
 
@@ -176,6 +180,7 @@ def generate_excel_report(
             ["LOW Risk:", low_count],
             [""],
             ["Data Source:", "NOAA MRMS"],
+            ["Forecasts:", f"{FORECAST_SKIPPED_MARKER} for stations already at FLOOD WARNING"],
         ]
 
         for row_idx, row_data in enumerate(summary_data, start=1):
@@ -192,59 +197,3 @@ def generate_excel_report(
     output.seek(0)
     return output
 
-
-def generate_csv_report(
-    stations: list[StationReport],
-    report_date: str,
-    generated_at: datetime,
-) -> str:
-    """Generate a CSV report string."""
-    data = []
-    for station in stations:
-        data.append({
-            "Date": report_date,
-            "Time": generated_at.strftime("%H:%M:%S"),
-            "Time Zone": generated_at.tzname() if generated_at.tzinfo else "UTC",
-            "Station Line": station.line,
-            "Stop Name": station.station_name,
-            "Borough": station.borough,
-            "CBD": station.cbd,
-            "Daytime Routes": station.daytime_routes,
-            "Structure": station.structure,
-            "GTFS Latitude": station.latitude,
-            "GTFS Longitude": station.longitude,
-            "Precip Rate (in/hr)": round(station.precip_rate_in_hr or 0, 3),
-            "1hr Accumulation (in)": round(station.accum_1hr_in or 0, 3),
-            "6hr Accumulation (in)": round(station.accum_6hr_in or 0, 3),
-            "Tide Level (ft)": round(station.tide_level_ft, 2) if station.tide_level_ft else "",
-            "Central Park Daily (in)": round(station.central_park_daily_in, 3)
-            if station.central_park_daily_in is not None
-            else "",
-            "Central Park Daily Date": station.central_park_daily_date or "",
-            "JFK Daily (in)": round(station.jfk_daily_in, 3)
-            if station.jfk_daily_in is not None
-            else "",
-            "JFK Daily Date": station.jfk_daily_date or "",
-            "LaGuardia Daily (in)": round(station.lga_daily_in, 3)
-            if station.lga_daily_in is not None
-            else "",
-            "LaGuardia Daily Date": station.lga_daily_date or "",
-            "Forecast 6hr (in)": round(station.forecast_6hr_in, 3)
-            if station.forecast_6hr_in is not None
-            else "",
-            "Forecast 24hr (in)": round(station.forecast_24hr_in, 3)
-            if station.forecast_24hr_in is not None
-            else "",
-            "Predicted Risk 6hr": station.predicted_risk_6hr.value
-            if station.predicted_risk_6hr
-            else "",
-            "Predicted Risk 24hr": station.predicted_risk_24hr.value
-            if station.predicted_risk_24hr
-            else "",
-            "Risk Level": station.risk_level.value,
-            "Risk Reason": station.risk_reason or "",
-            "Source": station.source,
-        })
-
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False)
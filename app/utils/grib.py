@@ -0,0 +1,69 @@
+import gzip
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+# ecCodes reads these when pygrib is first imported, so set them beforehand
+settings = get_settings()
+if not os.environ.get("ECCODES_DEFINITION_PATH"):
+    os.environ["ECCODES_DEFINITION_PATH"] = settings.eccodes_definition_path
+if not os.environ.get("ECCODES_SAMPLES_PATH"):
+    os.environ["ECCODES_SAMPLES_PATH"] = settings.eccodes_samples_path
+
+import pygrib
+
+# Chunk size for streaming decompression; the gzip module default is far smaller
+READ_BUFFER_SIZE = 128 * 1024
+GRIB_FILENAME = "message.grib2"
+
+LatLons = tuple[np.ndarray, np.ndarray]
+
+
+def read_first_message(
+    content: bytes, is_gzip: bool, with_latlons: bool = False
+) -> tuple[np.ndarray, Optional[LatLons]]:
+    """
+    Decode the first GRIB message from downloaded bytes.
+
+    Gzipped content is decompressed in memory, so only the decoded GRIB is
+    written to disk (pygrib can only open paths), inside a temporary
+    directory that is removed even if decoding fails. Masked cells are
+    filled with 0 and values are returned as a contiguous float32 array.
+
+    Returns:
+        (values, (lats, lons)) where the lat/lon grids are None unless
+        with_latlons is True
+    """
+    raw = gzip.decompress(content) if is_gzip else content
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        grib_path = os.path.join(tmp_dir, GRIB_FILENAME)
+        with open(grib_path, "wb") as grib_file:
+            grib_file.write(raw)
+        return _read_first_message(grib_path, with_latlons)
+
+
+def read_first_message_from_gzip_stream(
+    stream: BinaryIO, with_latlons: bool = False
+) -> tuple[np.ndarray, Optional[LatLons]]:
+    """Decode the first GRIB message from a gzipped byte stream, decompressing as it is read."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        grib_path = os.path.join(tmp_dir, GRIB_FILENAME)
+        with gzip.GzipFile(fileobj=stream, mode="rb") as gz_file, open(grib_path, "wb") as grib_file:
+            shutil.copyfileobj(gz_file, grib_file, length=READ_BUFFER_SIZE)
+        return _read_first_message(grib_path, with_latlons)
+
+
+def _read_first_message(grib_path: str, with_latlons: bool) -> tuple[np.ndarray, Optional[LatLons]]:
+    grbs = pygrib.open(grib_path)
+    try:
+        grb = grbs[1]
+        data = np.ascontiguousarray(np.ma.filled(grb.values, 0.0), dtype=np.float32)
+        latlons = grb.latlons() if with_latlons else None
+    finally:
+        grbs.close()
+    return data, latlons
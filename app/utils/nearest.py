@@ -0,0 +1,56 @@
+import numpy as np
+
+# numba is optional; without it the brute-force search runs in plain NumPy
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _nearest_numpy(
+    point_lats: np.ndarray, point_lons: np.ndarray, lats_q: np.ndarray, lons_q: np.ndarray
+) -> np.ndarray:
+    nearest = np.empty(len(lats_q), dtype=np.intp)
+    for k in range(len(lats_q)):
+        dist = (point_lats - lats_q[k]) ** 2 + (point_lons - lons_q[k]) ** 2
+        nearest[k] = np.argmin(dist)
+    return nearest
+
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True)
+    def _nearest_kernel(point_lats, point_lons, lats_q, lons_q):
+        nearest = np.empty(lats_q.shape[0], dtype=np.intp)
+        # One query per thread; each scans the points once without temporaries
+        for k in prange(lats_q.shape[0]):
+            best = np.inf
+            best_idx = 0
+            for idx in range(point_lats.shape[0]):
+                d = (point_lats[idx] - lats_q[k]) ** 2 + (point_lons[idx] - lons_q[k]) ** 2
+                if d < best:
+                    best = d
+                    best_idx = idx
+            nearest[k] = best_idx
+        return nearest
+
+
+def nearest_points(
+    point_lats: np.ndarray, point_lons: np.ndarray, lats_q: np.ndarray, lons_q: np.ndarray
+) -> np.ndarray:
+    """
+    Brute-force nearest point, by squared lat/lon distance, for each query.
+
+    Used when scipy's cKDTree is not installed; numba runs the search in
+    parallel without per-query temporaries when it is available.
+
+    Returns:
+        Index into point_lats/point_lons for each query point
+    """
+    point_lats = np.ascontiguousarray(point_lats, dtype=np.float64)
+    point_lons = np.ascontiguousarray(point_lons, dtype=np.float64)
+    lats_q = np.ascontiguousarray(lats_q, dtype=np.float64)
+    lons_q = np.ascontiguousarray(lons_q, dtype=np.float64)
+    if njit is not None:
+        return _nearest_kernel(point_lats, point_lons, lats_q, lons_q)
+    return _nearest_numpy(point_lats, point_lons, lats_q, lons_q)
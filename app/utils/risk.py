@@ -1,9 +1,47 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 
-from app.config import get_settings
+import numpy as np
+import pandas as pd
+
+from app.config import SETTINGS
 from app.models import RiskLevel
 
 
+class StructureThresholds(NamedTuple):
+    high_precip_rate: float
+    high_accum_6hr: float
+    atrisk_precip_rate: float
+    atrisk_accum_6hr: float
+
+
+# Settings are fixed for the life of the process, so snapshot the thresholds
+# once instead of reading them off the settings object on every station
+THRESHOLDS: dict[str, StructureThresholds] = {
+    "Subway": StructureThresholds(
+        SETTINGS.subway_high_precip_rate,
+        SETTINGS.subway_high_accum_6hr,
+        SETTINGS.subway_atrisk_precip_rate,
+        SETTINGS.subway_atrisk_accum_6hr,
+    ),
+    "Open Cut": StructureThresholds(
+        SETTINGS.opencut_high_precip_rate,
+        SETTINGS.opencut_high_accum_6hr,
+        SETTINGS.opencut_atrisk_precip_rate,
+        SETTINGS.opencut_atrisk_accum_6hr,
+    ),
+    "Default": StructureThresholds(
+        SETTINGS.default_high_precip_rate,
+        SETTINGS.default_high_accum_6hr,
+        SETTINGS.default_atrisk_precip_rate,
+        SETTINGS.default_atrisk_accum_6hr,
+    ),
+}
+TIDE_HIGH_LEVEL = SETTINGS.tide_high_level
+COASTAL_HIGH_PRECIP_RATE = SETTINGS.coastal_high_precip_rate
+COASTAL_ATRISK_PRECIP_RATE = SETTINGS.coastal_atrisk_precip_rate
+ELEVATED_ATRISK_PRECIP_RATE = SETTINGS.elevated_atrisk_precip_rate
+
+
 def calculate_risk(
     structure: str,
     precip_rate_in_hr: float,
@@ -25,7 +63,7 @@ def calculate_risk(
     Returns:
         RiskLevel enum value (HIGH, AT RISK, or LOW)
     """
-    settings = get_settings()
+    subway, open_cut, default = THRESHOLDS["Subway"], THRESHOLDS["Open Cut"], THRESHOLDS["Default"]
     structure_lower = structure.lower() if structure else ""
 
     # Handle missing values
@@ -34,36 +72,36 @@ def calculate_risk(
 
     # Underground stations (most vulnerable)
     if "subway" in structure_lower:
-        if precip_rate > settings.subway_high_precip_rate or accum_6hr > settings.subway_high_accum_6hr:
+        if precip_rate > subway.high_precip_rate or accum_6hr > subway.high_accum_6hr:
             return RiskLevel.HIGH
-        if precip_rate > settings.subway_atrisk_precip_rate or accum_6hr > settings.subway_atrisk_accum_6hr:
+        if precip_rate > subway.atrisk_precip_rate or accum_6hr > subway.atrisk_accum_6hr:
             return RiskLevel.AT_RISK
 
     # Open cut stations
     if "open cut" in structure_lower:
-        if precip_rate > settings.opencut_high_precip_rate or accum_6hr > settings.opencut_high_accum_6hr:
+        if precip_rate > open_cut.high_precip_rate or accum_6hr > open_cut.high_accum_6hr:
             return RiskLevel.HIGH
-        if precip_rate > settings.opencut_atrisk_precip_rate or accum_6hr > settings.opencut_atrisk_accum_6hr:
+        if precip_rate > open_cut.atrisk_precip_rate or accum_6hr > open_cut.atrisk_accum_6hr:
             return RiskLevel.AT_RISK
 
     # Coastal flooding factor
     if is_coastal and tide_level_ft is not None:
-        if tide_level_ft > settings.tide_high_level:
-            if precip_rate > settings.coastal_high_precip_rate:
+        if tide_level_ft > TIDE_HIGH_LEVEL:
+            if precip_rate > COASTAL_HIGH_PRECIP_RATE:
                 return RiskLevel.HIGH
-            if precip_rate > settings.coastal_atrisk_precip_rate:
+            if precip_rate > COASTAL_ATRISK_PRECIP_RATE:
                 return RiskLevel.AT_RISK
 
     # Elevated stations (safest from flooding)
     if "elevated" in structure_lower:
-        if precip_rate > settings.elevated_atrisk_precip_rate:
+        if precip_rate > ELEVATED_ATRISK_PRECIP_RATE:
             return RiskLevel.AT_RISK
         return RiskLevel.LOW
 
     # At-grade or other structures - use default thresholds
-    if precip_rate > settings.default_high_precip_rate or accum_6hr > settings.default_high_accum_6hr:
+    if precip_rate > default.high_precip_rate or accum_6hr > default.high_accum_6hr:
         return RiskLevel.HIGH
-    if precip_rate > settings.default_atrisk_precip_rate or accum_6hr > settings.default_atrisk_accum_6hr:
+    if precip_rate > default.atrisk_precip_rate or accum_6hr > default.atrisk_accum_6hr:
         return RiskLevel.AT_RISK
 
     return RiskLevel.LOW
@@ -79,95 +117,95 @@ def calculate_risk_with_reason(
     """
     Calculate flood risk level and return a short reason string.
     """
-    settings = get_settings()
+    subway, open_cut, default = THRESHOLDS["Subway"], THRESHOLDS["Open Cut"], THRESHOLDS["Default"]
     structure_lower = structure.lower() if structure else ""
 
     precip_rate = precip_rate_in_hr or 0.0
     accum_6hr = accum_6hr_in or 0.0
 
     if "subway" in structure_lower:
-        if precip_rate > settings.subway_high_precip_rate:
+        if precip_rate > subway.high_precip_rate:
             return (
                 RiskLevel.HIGH,
-                f"Subway: precip rate {precip_rate:.3f} > {settings.subway_high_precip_rate:.3f} in/hr",
+                f"Subway: precip rate {precip_rate:.3f} > {subway.high_precip_rate:.3f} in/hr",
             )
-        if accum_6hr > settings.subway_high_accum_6hr:
+        if accum_6hr > subway.high_accum_6hr:
             return (
                 RiskLevel.HIGH,
-                f"Subway: 6hr accumulation {accum_6hr:.3f} > {settings.subway_high_accum_6hr:.3f} in",
+                f"Subway: 6hr accumulation {accum_6hr:.3f} > {subway.high_accum_6hr:.3f} in",
             )
-        if precip_rate > settings.subway_atrisk_precip_rate:
+        if precip_rate > subway.atrisk_precip_rate:
             return (
                 RiskLevel.AT_RISK,
-                f"Subway: precip rate {precip_rate:.3f} > {settings.subway_atrisk_precip_rate:.3f} in/hr",
+                f"Subway: precip rate {precip_rate:.3f} > {subway.atrisk_precip_rate:.3f} in/hr",
             )
-        if accum_6hr > settings.subway_atrisk_accum_6hr:
+        if accum_6hr > subway.atrisk_accum_6hr:
             return (
                 RiskLevel.AT_RISK,
-                f"Subway: 6hr accumulation {accum_6hr:.3f} > {settings.subway_atrisk_accum_6hr:.3f} in",
+                f"Subway: 6hr accumulation {accum_6hr:.3f} > {subway.atrisk_accum_6hr:.3f} in",
             )
 
     if "open cut" in structure_lower:
-        if precip_rate > settings.opencut_high_precip_rate:
+        if precip_rate > open_cut.high_precip_rate:
             return (
                 RiskLevel.HIGH,
-                f"Open Cut: precip rate {precip_rate:.3f} > {settings.opencut_high_precip_rate:.3f} in/hr",
+                f"Open Cut: precip rate {precip_rate:.3f} > {open_cut.high_precip_rate:.3f} in/hr",
             )
-        if accum_6hr > settings.opencut_high_accum_6hr:
+        if accum_6hr > open_cut.high_accum_6hr:
             return (
                 RiskLevel.HIGH,
-                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {settings.opencut_high_accum_6hr:.3f} in",
+                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {open_cut.high_accum_6hr:.3f} in",
             )
-        if precip_rate > settings.opencut_atrisk_precip_rate:
+        if precip_rate > open_cut.atrisk_precip_rate:
             return (
                 RiskLevel.AT_RISK,
-                f"Open Cut: precip rate {precip_rate:.3f} > {settings.opencut_atrisk_precip_rate:.3f} in/hr",
+                f"Open Cut: precip rate {precip_rate:.3f} > {open_cut.atrisk_precip_rate:.3f} in/hr",
             )
-        if accum_6hr > settings.opencut_atrisk_accum_6hr:
+        if accum_6hr > open_cut.atrisk_accum_6hr:
             return (
                 RiskLevel.AT_RISK,
-                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {settings.opencut_atrisk_accum_6hr:.3f} in",
+                f"Open Cut: 6hr accumulation {accum_6hr:.3f} > {open_cut.atrisk_accum_6hr:.3f} in",
             )
 
-    if is_coastal and tide_level_ft is not None and tide_level_ft > settings.tide_high_level:
-        if precip_rate > settings.coastal_high_precip_rate:
+    if is_coastal and tide_level_ft is not None and tide_level_ft > TIDE_HIGH_LEVEL:
+        if precip_rate > COASTAL_HIGH_PRECIP_RATE:
             return (
                 RiskLevel.HIGH,
-                f"Coastal: tide {tide_level_ft:.2f}ft > {settings.tide_high_level:.2f}ft and precip rate {precip_rate:.3f} > {settings.coastal_high_precip_rate:.3f} in/hr",
+                f"Coastal: tide {tide_level_ft:.2f}ft > {TIDE_HIGH_LEVEL:.2f}ft and precip rate {precip_rate:.3f} > {COASTAL_HIGH_PRECIP_RATE:.3f} in/hr",
             )
-        if precip_rate > settings.coastal_atrisk_precip_rate:
+        if precip_rate > COASTAL_ATRISK_PRECIP_RATE:
             return (
                 RiskLevel.AT_RISK,
-                f"Coastal: tide {tide_level_ft:.2f}ft > {settings.tide_high_level:.2f}ft and precip rate {precip_rate:.3f} > {settings.coastal_atrisk_precip_rate:.3f} in/hr",
+                f"Coastal: tide {tide_level_ft:.2f}ft > {TIDE_HIGH_LEVEL:.2f}ft and precip rate {precip_rate:.3f} > {COASTAL_ATRISK_PRECIP_RATE:.3f} in/hr",
             )
 
     if "elevated" in structure_lower:
-        if precip_rate > settings.elevated_atrisk_precip_rate:
+        if precip_rate > ELEVATED_ATRISK_PRECIP_RATE:
             return (
                 RiskLevel.AT_RISK,
-                f"Elevated: precip rate {precip_rate:.3f} > {settings.elevated_atrisk_precip_rate:.3f} in/hr",
+                f"Elevated: precip rate {precip_rate:.3f} > {ELEVATED_ATRISK_PRECIP_RATE:.3f} in/hr",
             )
-        return RiskLevel.LOW, f"Elevated: precip rate {precip_rate:.3f} <= {settings.elevated_atrisk_precip_rate:.3f} in/hr"
+        return RiskLevel.LOW, f"Elevated: precip rate {precip_rate:.3f} <= {ELEVATED_ATRISK_PRECIP_RATE:.3f} in/hr"
 
-    if precip_rate > settings.default_high_precip_rate:
+    if precip_rate > default.high_precip_rate:
         return (
             RiskLevel.HIGH,
-            f"Default: precip rate {precip_rate:.3f} > {settings.default_high_precip_rate:.3f} in/hr",
+            f"Default: precip rate {precip_rate:.3f} > {default.high_precip_rate:.3f} in/hr",
         )
-    if accum_6hr > settings.default_high_accum_6hr:
+    if accum_6hr > default.high_accum_6hr:
         return (
             RiskLevel.HIGH,
-            f"Default: 6hr accumulation {accum_6hr:.3f} > {settings.default_high_accum_6hr:.3f} in",
+            f"Default: 6hr accumulation {accum_6hr:.3f} > {default.high_accum_6hr:.3f} in",
         )
-    if precip_rate > settings.default_atrisk_precip_rate:
+    if precip_rate > default.atrisk_precip_rate:
         return (
             RiskLevel.AT_RISK,
-            f"Default: precip rate {precip_rate:.3f} > {settings.default_atrisk_precip_rate:.3f} in/hr",
+            f"Default: precip rate {precip_rate:.3f} > {default.atrisk_precip_rate:.3f} in/hr",
         )
-    if accum_6hr > settings.default_atrisk_accum_6hr:
+    if accum_6hr > default.atrisk_accum_6hr:
         return (
             RiskLevel.AT_RISK,
-            f"Default: 6hr accumulation {accum_6hr:.3f} > {settings.default_atrisk_accum_6hr:.3f} in",
+            f"Default: 6hr accumulation {accum_6hr:.3f} > {default.atrisk_accum_6hr:.3f} in",
         )
 
     return (
@@ -206,50 +244,196 @@ def calculate_predicted_risk(
     if window_hours <= 0:
         return RiskLevel.LOW
 
-    settings = get_settings()
+    subway, open_cut, default = THRESHOLDS["Subway"], THRESHOLDS["Open Cut"], THRESHOLDS["Default"]
     structure_lower = structure.lower() if structure else ""
     avg_rate = forecast_total_in / float(window_hours)
     accum_factor = window_hours / 6.0
 
-    subway_high_accum = settings.subway_high_accum_6hr * accum_factor
-    subway_atrisk_accum = settings.subway_atrisk_accum_6hr * accum_factor
-    opencut_high_accum = settings.opencut_high_accum_6hr * accum_factor
-    opencut_atrisk_accum = settings.opencut_atrisk_accum_6hr * accum_factor
-    default_high_accum = settings.default_high_accum_6hr * accum_factor
-    default_atrisk_accum = settings.default_atrisk_accum_6hr * accum_factor
+    subway_high_accum = subway.high_accum_6hr * accum_factor
+    subway_atrisk_accum = subway.atrisk_accum_6hr * accum_factor
+    opencut_high_accum = open_cut.high_accum_6hr * accum_factor
+    opencut_atrisk_accum = open_cut.atrisk_accum_6hr * accum_factor
+    default_high_accum = default.high_accum_6hr * accum_factor
+    default_atrisk_accum = default.atrisk_accum_6hr * accum_factor
 
     # Underground stations
     if "subway" in structure_lower:
-        if avg_rate > settings.subway_high_precip_rate or forecast_total_in > subway_high_accum:
+        if avg_rate > subway.high_precip_rate or forecast_total_in > subway_high_accum:
             return RiskLevel.HIGH
-        if avg_rate > settings.subway_atrisk_precip_rate or forecast_total_in > subway_atrisk_accum:
+        if avg_rate > subway.atrisk_precip_rate or forecast_total_in > subway_atrisk_accum:
             return RiskLevel.AT_RISK
 
     # Open cut stations
     if "open cut" in structure_lower:
-        if avg_rate > settings.opencut_high_precip_rate or forecast_total_in > opencut_high_accum:
+        if avg_rate > open_cut.high_precip_rate or forecast_total_in > opencut_high_accum:
             return RiskLevel.HIGH
-        if avg_rate > settings.opencut_atrisk_precip_rate or forecast_total_in > opencut_atrisk_accum:
+        if avg_rate > open_cut.atrisk_precip_rate or forecast_total_in > opencut_atrisk_accum:
             return RiskLevel.AT_RISK
 
     # Coastal flooding factor
     if is_coastal and tide_level_ft is not None:
-        if tide_level_ft > settings.tide_high_level:
-            if avg_rate > settings.coastal_high_precip_rate:
+        if tide_level_ft > TIDE_HIGH_LEVEL:
+            if avg_rate > COASTAL_HIGH_PRECIP_RATE:
                 return RiskLevel.HIGH
-            if avg_rate > settings.coastal_atrisk_precip_rate:
+            if avg_rate > COASTAL_ATRISK_PRECIP_RATE:
                 return RiskLevel.AT_RISK
 
     # Elevated stations
     if "elevated" in structure_lower:
-        if avg_rate > settings.elevated_atrisk_precip_rate:
+        if avg_rate > ELEVATED_ATRISK_PRECIP_RATE:
             return RiskLevel.AT_RISK
         return RiskLevel.LOW
 
     # Default thresholds
-    if avg_rate > settings.default_high_precip_rate or forecast_total_in > default_high_accum:
+    if avg_rate > default.high_precip_rate or forecast_total_in > default_high_accum:
         return RiskLevel.HIGH
-    if avg_rate > settings.default_atrisk_precip_rate or forecast_total_in > default_atrisk_accum:
+    if avg_rate > default.atrisk_precip_rate or forecast_total_in > default_atrisk_accum:
         return RiskLevel.AT_RISK
 
     return RiskLevel.LOW
+
+
+def calculate_risk_batch(
+    structures: pd.Series,
+    precip_rate_in_hr: np.ndarray,
+    accum_6hr_in: np.ndarray,
+    tide_level_ft: Optional[float] = None,
+    is_coastal: Optional[np.ndarray] = None,
+    with_reason: bool = True,
+) -> tuple[list[RiskLevel], Optional[list[str]]]:
+    """
+    Calculate flood risk levels (and reasons) for many stations at once.
+
+    Applies the same rules, in the same order, as calculate_risk_with_reason
+    using boolean masks over the station arrays; each station gets the level
+    of the first rule it matches.
+
+    Args:
+        structures: Station structure types, one per station
+        precip_rate_in_hr: Precipitation rates in inches/hour
+        accum_6hr_in: 6-hour accumulations in inches
+        tide_level_ft: Current tide level in feet (applies to coastal stations)
+        is_coastal: Boolean mask of stations in a coastal flood zone
+        with_reason: Whether to build the reason strings
+
+    Returns:
+        (risk levels, reasons) lists aligned with the inputs; reasons is None
+        when with_reason is False
+    """
+    subway, open_cut, default = THRESHOLDS["Subway"], THRESHOLDS["Open Cut"], THRESHOLDS["Default"]
+    structure_lower = pd.Series(structures, dtype=object).fillna("").astype(str).str.lower()
+    is_subway = structure_lower.str.contains("subway", regex=False).to_numpy()
+    is_open_cut = structure_lower.str.contains("open cut", regex=False).to_numpy()
+    is_elevated = structure_lower.str.contains("elevated", regex=False).to_numpy()
+
+    precip_rate = np.asarray(precip_rate_in_hr, dtype=float)
+    accum_6hr = np.asarray(accum_6hr_in, dtype=float)
+    if is_coastal is None:
+        is_coastal = np.zeros(len(precip_rate), dtype=bool)
+    tide_high = np.asarray(is_coastal, dtype=bool) & (
+        tide_level_ft is not None and tide_level_ft > TIDE_HIGH_LEVEL
+    )
+
+    # (mask, level, reason template) in evaluation order
+    rules = [
+        (
+            is_subway & (precip_rate > subway.high_precip_rate),
+            RiskLevel.HIGH,
+            f"Subway: precip rate {{rate:.3f}} > {subway.high_precip_rate:.3f} in/hr",
+        ),
+        (
+            is_subway & (accum_6hr > subway.high_accum_6hr),
+            RiskLevel.HIGH,
+            f"Subway: 6hr accumulation {{accum:.3f}} > {subway.high_accum_6hr:.3f} in",
+        ),
+        (
+            is_subway & (precip_rate > subway.atrisk_precip_rate),
+            RiskLevel.AT_RISK,
+            f"Subway: precip rate {{rate:.3f}} > {subway.atrisk_precip_rate:.3f} in/hr",
+        ),
+        (
+            is_subway & (accum_6hr > subway.atrisk_accum_6hr),
+            RiskLevel.AT_RISK,
+            f"Subway: 6hr accumulation {{accum:.3f}} > {subway.atrisk_accum_6hr:.3f} in",
+        ),
+        (
+            is_open_cut & (precip_rate > open_cut.high_precip_rate),
+            RiskLevel.HIGH,
+            f"Open Cut: precip rate {{rate:.3f}} > {open_cut.high_precip_rate:.3f} in/hr",
+        ),
+        (
+            is_open_cut & (accum_6hr > open_cut.high_accum_6hr),
+            RiskLevel.HIGH,
+            f"Open Cut: 6hr accumulation {{accum:.3f}} > {open_cut.high_accum_6hr:.3f} in",
+        ),
+        (
+            is_open_cut & (precip_rate > open_cut.atrisk_precip_rate),
+            RiskLevel.AT_RISK,
+            f"Open Cut: precip rate {{rate:.3f}} > {open_cut.atrisk_precip_rate:.3f} in/hr",
+        ),
+        (
+            is_open_cut & (accum_6hr > open_cut.atrisk_accum_6hr),
+            RiskLevel.AT_RISK,
+            f"Open Cut: 6hr accumulation {{accum:.3f}} > {open_cut.atrisk_accum_6hr:.3f} in",
+        ),
+        (
+            tide_high & (precip_rate > COASTAL_HIGH_PRECIP_RATE),
+            RiskLevel.HIGH,
+            f"Coastal: tide {{tide:.2f}}ft > {TIDE_HIGH_LEVEL:.2f}ft and precip rate {{rate:.3f}} > {COASTAL_HIGH_PRECIP_RATE:.3f} in/hr",
+        ),
+        (
+            tide_high & (precip_rate > COASTAL_ATRISK_PRECIP_RATE),
+            RiskLevel.AT_RISK,
+            f"Coastal: tide {{tide:.2f}}ft > {TIDE_HIGH_LEVEL:.2f}ft and precip rate {{rate:.3f}} > {COASTAL_ATRISK_PRECIP_RATE:.3f} in/hr",
+        ),
+        (
+            is_elevated & (precip_rate > ELEVATED_ATRISK_PRECIP_RATE),
+            RiskLevel.AT_RISK,
+            f"Elevated: precip rate {{rate:.3f}} > {ELEVATED_ATRISK_PRECIP_RATE:.3f} in/hr",
+        ),
+        (
+            is_elevated,
+            RiskLevel.LOW,
+            f"Elevated: precip rate {{rate:.3f}} <= {ELEVATED_ATRISK_PRECIP_RATE:.3f} in/hr",
+        ),
+        (
+            precip_rate > default.high_precip_rate,
+            RiskLevel.HIGH,
+            f"Default: precip rate {{rate:.3f}} > {default.high_precip_rate:.3f} in/hr",
+        ),
+        (
+            accum_6hr > default.high_accum_6hr,
+            RiskLevel.HIGH,
+            f"Default: 6hr accumulation {{accum:.3f}} > {default.high_accum_6hr:.3f} in",
+        ),
+        (
+            precip_rate > default.atrisk_precip_rate,
+            RiskLevel.AT_RISK,
+            f"Default: precip rate {{rate:.3f}} > {default.atrisk_precip_rate:.3f} in/hr",
+        ),
+        (
+            accum_6hr > default.atrisk_accum_6hr,
+            RiskLevel.AT_RISK,
+            f"Default: 6hr accumulation {{accum:.3f}} > {default.atrisk_accum_6hr:.3f} in",
+        ),
+    ]
+
+    levels = [level for _, level, _ in rules] + [RiskLevel.LOW]
+    matched = np.select(
+        [mask for mask, _, _ in rules],
+        np.arange(len(rules)),
+        default=len(rules),
+    ).tolist()
+    risks = [levels[idx] for idx in matched]
+
+    if not with_reason:
+        return risks, None
+
+    templates = [template for _, _, template in rules] + [
+        "Below thresholds: rate {rate:.3f} in/hr, 6hr {accum:.3f} in"
+    ]
+    reasons = [
+        templates[idx].format(rate=rate, accum=accum, tide=tide_level_ft)
+        for idx, rate, accum in zip(matched, precip_rate.tolist(), accum_6hr.tolist())
+    ]
+    return risks, reasons
@@ -0,0 +1,54 @@
+import asyncio
+import importlib.util
+import unittest
+from datetime import datetime, timezone
+
+HOURLY_FILES = [f"ST4.20240501{hour:02d}.01h.gz" for hour in range(24)]
+
+
+def _utc(hour: int, minute: int) -> datetime:
+    return datetime(2024, 5, 1, hour, minute, tzinfo=timezone.utc)
+
+
+@unittest.skipIf(importlib.util.find_spec("pygrib") is None, "pygrib is not installed")
+class FindNearestFileTests(unittest.TestCase):
+    def setUp(self):
+        from app.services.stage4 import Stage4Service
+
+        self.service = Stage4Service()
+
+        async def list_dir(date):
+            return HOURLY_FILES
+
+        self.service._list_dir = list_dir
+
+    def _nearest(self, target: datetime) -> str:
+        _, filename = asyncio.run(self.service._find_nearest_file(target))
+        return filename
+
+    def test_picks_closest_hour(self):
+        cases = [
+            (_utc(14, 0), "ST4.2024050114.01h.gz"),
+            (_utc(14, 20), "ST4.2024050114.01h.gz"),
+            (_utc(14, 50), "ST4.2024050115.01h.gz"),
+            (_utc(12, 40), "ST4.2024050113.01h.gz"),
+        ]
+        for target, expected in cases:
+            with self.subTest(target=target):
+                self.assertEqual(self._nearest(target), expected)
+
+    def test_memo_does_not_depend_on_request_order(self):
+        async def lookups():
+            early = await self.service._find_nearest_file(_utc(14, 10))
+            late = await self.service._find_nearest_file(_utc(14, 50))
+            again = await self.service._find_nearest_file(_utc(14, 25))
+            return early[1], late[1], again[1]
+
+        self.assertEqual(
+            asyncio.run(lookups()),
+            ("ST4.2024050114.01h.gz", "ST4.2024050115.01h.gz", "ST4.2024050114.01h.gz"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()